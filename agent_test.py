@@ -3,13 +3,49 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import os
+import tempfile
 import unittest
 
+from importlib.util import find_spec
+
 import isolation
 import game_agent
 
 from importlib import reload
 
+# The methods and attributes of the original isolation.Board, which is what
+# the project reviewers run game_agent.py against
+PLAIN_API = ("width", "height", "move_count", "active_player", "inactive_player",
+             "get_opponent", "move_is_legal", "get_blank_spaces",
+             "get_player_location", "get_legal_moves", "apply_move", "is_winner",
+             "is_loser", "utility", "hash", "print_board", "to_string", "play")
+
+
+class PlainBoard:
+    """A Board limited to the original API."""
+
+    def __init__(self, board):
+        self._board = board
+
+    def __getattr__(self, name):
+        if name not in PLAIN_API:
+            raise AttributeError(name)
+        return getattr(self._board, name)
+
+    def copy(self):
+        return PlainBoard(self._board.copy())
+
+    def forecast_move(self, move):
+        return PlainBoard(self._board.forecast_move(move))
+
+
+class ForfeitPlayer:
+    """A player that forfeits its first move."""
+
+    def get_move(self, game, time_left):
+        return (-1, -1)
+
 
 class IsolationTest(unittest.TestCase):
     """Unit tests for isolation agents"""
@@ -20,6 +56,599 @@ class IsolationTest(unittest.TestCase):
         self.player2 = "Player2"
         self.game = isolation.Board(self.player1, self.player2)
 
+    def temp_path(self, name):
+        """Return a path named `name` in a directory removed after the test."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return os.path.join(directory.name, name)
+
+    def test_default_players_use_only_the_original_board_api(self):
+        """The graded heuristics and players run on the original Board."""
+        from timeit import default_timer
+        minimax, alphabeta = game_agent.MinimaxPlayer(), game_agent.AlphaBetaPlayer()
+        game = PlainBoard(isolation.Board(minimax, alphabeta, 5, 5))
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        for score_fn in (game_agent.custom_score, game_agent.custom_score_2,
+                         game_agent.custom_score_3):
+            self.assertIsInstance(score_fn(game, minimax), float)
+        self.assertIn(minimax.get_move(game, lambda: float("inf")), game.get_legal_moves())
+        game.apply_move((0, 1))
+        start = default_timer()
+        time_left = lambda: 100 - 1000 * (default_timer() - start)
+        self.assertIn(alphabeta.get_move(game, time_left), game.get_legal_moves())
+
+    def test_isolation_player_keeps_its_documented_interface(self):
+        """The search machinery lives in mixins, not the base class."""
+        self.assertEqual(set(vars(game_agent.IsolationPlayer())),
+                         {"search_depth", "score", "time_left", "TIMER_THRESHOLD"})
+        self.assertFalse(hasattr(game_agent.IsolationPlayer, "negamax"))
+        for player in (game_agent.MinimaxPlayer, game_agent.AlphaBetaPlayer):
+            self.assertTrue(issubclass(player, game_agent.NegamaxMixin))
+
+    def test_bitboard_blocks_visited_cells(self):
+        """Cells occupied by either player are never legal again."""
+        self.game.apply_move((0, 0))
+        self.game.apply_move((6, 6))
+        self.game.apply_move((1, 2))
+        self.assertNotIn((0, 0), self.game.get_blank_spaces())
+        self.assertNotIn((0, 0), self.game.get_legal_moves(self.player1))
+        self.assertEqual(self.game.get_player_location(self.player1), (1, 2))
+        self.assertEqual(self.game.get_player_location(self.player2), (6, 6))
+        self.assertEqual(len(self.game.get_blank_spaces()), 46)
+
+    def test_forecast_move_leaves_original_untouched(self):
+        """forecast_move returns an independent copy of the state."""
+        self.game.apply_move((3, 3))
+        child = self.game.forecast_move((0, 0))
+        self.assertEqual(self.game.get_player_location(self.player2), None)
+        self.assertEqual(child.get_player_location(self.player2), (0, 0))
+        self.assertEqual(child.move_count, self.game.move_count + 1)
+        self.assertNotEqual(child.to_string(), self.game.to_string())
+
+    def test_make_move_undo_move_round_trip(self):
+        """undo_move restores the exact state from before make_move."""
+        self.game.apply_move((3, 3))
+        self.game.apply_move((0, 0))
+        before = (self.game.to_string(), self.game.move_count,
+                  self.game.active_player, self.game.hash())
+        self.game.make_move((1, 2))
+        self.game.make_move((2, 1))
+        self.game.undo_move()
+        self.game.undo_move()
+        after = (self.game.to_string(), self.game.move_count,
+                 self.game.active_player, self.game.hash())
+        self.assertEqual(before, after)
+
+    def test_terminal_status_and_cached_moves(self):
+        """The cached move lists follow the state through make/undo."""
+        game = isolation.Board(self.player1, self.player2, 3, 3)
+        game.apply_move((0, 0))
+        game.apply_move((2, 2))
+        self.assertIsNone(game.terminal_status())
+        self.assertEqual(sorted(game.get_legal_moves()), [(1, 2), (2, 1)])
+        for move in [(1, 2), (0, 1), (2, 0)]:
+            game.make_move(move)
+        self.assertEqual(game.get_legal_moves(), [])
+        self.assertIs(game.terminal_status(), self.player1)
+        self.assertTrue(game.is_loser(self.player2))
+        for _ in range(3):
+            game.undo_move()
+        self.assertEqual(sorted(game.get_legal_moves()), [(1, 2), (2, 1)])
+
+    def test_zobrist_hash_tracks_state(self):
+        """Equal states hash equally, whichever path built them."""
+        other = isolation.Board(self.player1, self.player2)
+        for move in [(0, 0), (6, 6), (1, 2)]:
+            self.game.apply_move(move)
+        other.make_move((0, 0))
+        other = other.forecast_move((6, 6))
+        other.make_move((2, 1))
+        self.assertNotEqual(self.game.hash(), other.hash())
+        other.undo_move()
+        other.apply_move((1, 2))
+        self.assertEqual(self.game.hash(), other.hash())
+        self.assertEqual({self.game.hash(): 1}.get(other.hash()), 1)
+
+    def test_in_place_search_matches_forecast_search(self):
+        """Searching with make/undo finds the same moves and scores as
+        forecast_move, and leaves the caller's board as it was."""
+        from sample_players import improved_score
+        results = []
+        for in_place in (False, True):
+            minimax = game_agent.MinimaxPlayer(score_fn=improved_score, in_place=in_place)
+            alphabeta = game_agent.AlphaBetaPlayer(score_fn=improved_score, in_place=in_place)
+            minimax.time_left = alphabeta.time_left = lambda: float("inf")
+            game = isolation.Board(minimax, alphabeta, shuffle_moves=False)
+            for move in [(2, 3), (4, 4), (0, 2)]:
+                game.apply_move(move)
+            reply = game.forecast_move((2, 5))
+            before = [(board.hash(), board.to_string(), board.move_count)
+                      for board in (game, reply)]
+            results.append([minimax.minimax(game, 3)] +
+                           [alphabeta.alphabeta_root(reply, depth) for depth in range(1, 5)])
+            self.assertEqual([(board.hash(), board.to_string(), board.move_count)
+                              for board in (game, reply)], before)
+        self.assertEqual(results[0], results[1])
+
+    def test_transposition_table_replacement(self):
+        """Depth-preferred slots keep the deeper entry within a search."""
+        table = game_agent.TranspositionTable(max_entries=1, replacement="depth")
+        table.store(1, 4, table.EXACT, 1., (0, 0))
+        table.store(2, 2, table.LOWER, 2., (1, 1))
+        self.assertEqual(table.probe(1), (4, table.EXACT, 1., (0, 0)))
+        self.assertIsNone(table.probe(2))
+        table.new_search()
+        table.store(2, 2, table.LOWER, 2., (1, 1))
+        self.assertEqual(table.probe(2), (2, table.LOWER, 2., (1, 1)))
+        self.assertEqual((table.probes, table.hits), (1, 1))
+
+    def test_deterministic_and_seeded_move_order(self):
+        """Unshuffled and seeded boards generate reproducible move lists,
+        and the first move of each player is chosen from the open cells in
+        order without drawing from `random`."""
+        import random
+        fixed = isolation.Board(self.player1, self.player2, shuffle_moves=False)
+        fixed.apply_move((3, 3))
+        self.assertEqual(fixed.get_legal_moves(self.player1),
+                         [(1, 2), (1, 4), (2, 1), (2, 5),
+                          (4, 1), (4, 5), (5, 2), (5, 4)])
+        orders = []
+        for _ in range(2):
+            seeded = isolation.Board(self.player1, self.player2, seed=7)
+            seeded.apply_move((3, 3))
+            child = seeded.forecast_move((0, 0))
+            orders.append([seeded.get_legal_moves(self.player1),
+                           child.get_legal_moves(self.player1)])
+        self.assertEqual(orders[0], orders[1])
+        state = random.getstate()
+        self.assertEqual(self.game.get_legal_moves(), self.game.get_blank_spaces())
+        self.assertEqual(random.getstate(), state)
+
+    def test_move_ordering_priorities(self):
+        """The hint or PV move sorts first, then killers, then history."""
+        game = isolation.Board(self.player1, self.player2, shuffle_moves=False)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        ordering = game_agent.MoveOrdering()
+        ordering.new_search(game)
+        ordering.record_cutoff(game, (4, 1), 1)
+        ordering.record_cutoff(game.forecast_move((1, 2)).forecast_move((2, 1)), (5, 4), 3)
+        self.assertEqual(ordering.order(game, game.get_legal_moves(), (2, 5)),
+                         [(2, 5), (4, 1), (5, 4), (1, 2), (1, 4), (2, 1), (4, 5), (5, 2)])
+        ordering.record_best(game, (1, 4))
+        ordering.new_iteration(game)
+        self.assertEqual(ordering.order(game, game.get_legal_moves())[:3],
+                         [(1, 4), (4, 1), (5, 4)])
+
+    def test_move_ordering_keeps_scores_and_saves_nodes(self):
+        """Ordered search finds the same root scores in fewer nodes."""
+        from sample_players import improved_score
+        results = []
+        for ordering in (None, game_agent.MoveOrdering()):
+            player = game_agent.AlphaBetaPlayer(score_fn=improved_score, move_ordering=ordering)
+            player.time_left = lambda: float("inf")
+            game = isolation.Board(player, self.player2, shuffle_moves=False)
+            for move in [(2, 3), (4, 4), (0, 2), (2, 5)]:
+                game.apply_move(move)
+            if ordering is not None:
+                ordering.new_search(game)
+            scores = [player.alphabeta_root(game, depth)[1] for depth in range(1, 6)]
+            results.append((scores, player.nodes))
+        self.assertEqual(results[0][0], results[1][0])
+        self.assertLess(results[1][1], results[0][1])
+
+    def test_pvs_and_aspiration_match_alphabeta(self):
+        """PVS and aspiration windows find the same root score."""
+        from sample_players import improved_score
+        scores = []
+        for options in [{}, {"search_mode": "pvs", "aspiration_window": 1.}]:
+            player = game_agent.AlphaBetaPlayer(score_fn=improved_score, **options)
+            player.time_left = lambda: float("inf")
+            game = isolation.Board(player, self.player2, 5, 5, seed=3)
+            for move in [(2, 2), (0, 0), (0, 1), (1, 2)]:
+                game.apply_move(move)
+            score = None
+            for depth in range(1, 5):
+                _, score = player.aspiration_search(game, depth, score)
+            scores.append(score)
+        self.assertEqual(scores[0], scores[1])
+
+    def test_endgame_solver_on_partitioned_board(self):
+        """A partitioned endgame is won by the player with the longer path."""
+        game = isolation.Board(self.player1, self.player2, 5, 5)
+        for move in [(0, 1), (0, 4), (1, 3), (2, 3), (3, 2), (4, 4)]:
+            game.apply_move(move)
+        self.assertTrue(game.is_partitioned())
+        self.assertEqual(game.reachable_mask(self.player2), 0)
+        self.assertEqual(game.longest_path(self.player1)[0], 19)
+        score, move = game_agent.EndgameSolver(min_moves=0).solve(game)
+        self.assertEqual(score, float("inf"))
+        self.assertIn(move, game.get_legal_moves())
+
+    def test_time_manager_declines_iterations_that_cannot_finish(self):
+        """The next iteration is predicted from node growth, and deepening
+        stops once the depth covers every open cell."""
+        clock = [100.]
+        manager = game_agent.TimeManager()
+        game = isolation.Board(self.player1, self.player2)
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        scaled = game_agent.TimeManager(phase_weights=(0.8, 1., 0.6), busy_moves=16,
+                                        quiet_weight=0.5)
+        scaled.start(game, lambda: clock[0], 10.)
+        self.assertAlmostEqual(scaled.budget, 90 * 0.8 * 0.75)
+        manager.start(game, lambda: clock[0], 10.)
+        self.assertEqual(manager.budget, 90.)
+        clock[0] = 99.
+        self.assertTrue(manager.next_iteration(1, 10))
+        clock[0] = 89.  # 100 nodes in 10 ms: depth 3 would take about 100 ms more.
+        self.assertFalse(manager.next_iteration(2, 110))
+        self.assertEqual(manager.declined, 1)
+
+        player = game_agent.AlphaBetaPlayer(time_manager=game_agent.TimeManager(), stats=True)
+        game = isolation.Board(player, self.player2, 4, 3)
+        game.apply_move((1, 1))
+        game.apply_move((0, 3))
+        self.assertIn(player.get_move(game, lambda: 1e9), game.get_legal_moves())
+        self.assertEqual(player.stats.depth, 10)
+
+    def test_interrupted_iteration_keeps_proven_root_moves(self):
+        """A root move beats the previous choice only once both were fully
+        searched and its score is exact."""
+        player = game_agent.AlphaBetaPlayer(partial_results=True)
+        player._root_alpha, player._root_results = float("-inf"), [(1., (0, 1)), (5., (2, 3))]
+        self.assertEqual(player.partial_move((0, 1)), (2, 3))
+        self.assertEqual(player.partial_move((4, 4)), (4, 4))
+        self.assertEqual(player.partial_move((-1, -1)), (2, 3))
+        player._root_alpha = 5.
+        self.assertEqual(player.partial_move((0, 1)), (0, 1))
+
+        calls = [0]
+        def time_left():  # Expires after the first root move of depth 1.
+            calls[0] += 1
+            return 1000. if calls[0] <= 3 else 0.
+        for player in (player, game_agent.AlphaBetaPlayer()):  # Opt-in, so off by default.
+            calls[0] = 0
+            game = isolation.Board(player, self.player2)
+            game.apply_move((2, 2))
+            game.apply_move((0, 0))
+            moves = game.get_legal_moves() if player.partial_results else [(-1, -1)]
+            self.assertIn(player.get_move(game, time_left), moves)
+
+    def test_pondering_hits_and_misses(self):
+        """A predicted reply is answered by the pondering worker, and any
+        other position is searched from scratch."""
+        from timeit import default_timer
+        from sample_players import improved_score
+        def timer(limit=50.):
+            start = default_timer()
+            return lambda: limit - 1000 * (default_timer() - start)
+        player = game_agent.PonderingPlayer(game_agent.AlphaBetaPlayer(score_fn=improved_score))
+        try:
+            game = isolation.Board(player, self.player2, 5, 5)
+            game.apply_move((2, 2))
+            game.apply_move((0, 0))
+            game.apply_move(player.get_move(game, timer()))
+            game.apply_move(player._pondered[0])
+            self.assertIn(player.get_move(game, timer()), game.get_legal_moves())
+            self.assertEqual((player.ponder_hits, player.ponder_misses), (1, 0))
+
+            other = isolation.Board(player, self.player2, 5, 5)
+            other.apply_move((0, 0))
+            other.apply_move((4, 4))
+            self.assertIn(player.get_move(other, timer()), other.get_legal_moves())
+            self.assertEqual((player.ponder_hits, player.ponder_misses), (1, 1))
+        finally:
+            player.close()
+
+    def test_search_stats_record_each_move(self):
+        """Enabled statistics count the nodes of the last get_move call."""
+        player = game_agent.MinimaxPlayer(search_depth=2, stats=True)
+        game = isolation.Board(player, self.player2, 5, 5)
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        player.get_move(game, lambda: float("inf"))
+        self.assertEqual(player.stats.depth, 2)
+        self.assertGreater(player.stats.nodes, player.stats.leaf_evaluations)
+        self.assertIsNone(game_agent.MinimaxPlayer().stats)
+
+    def test_eval_cache_counts_hits_and_clears_per_game(self):
+        """Repeated leaves are scored once, and a new game empties the cache."""
+        from sample_players import improved_score
+        player = game_agent.MinimaxPlayer(score_fn=improved_score, eval_cache=100)
+        game = isolation.Board(player, self.player2, 5, 5)
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        self.assertEqual(player.score(game, player), improved_score(game, player))
+        self.assertEqual(player.score(game, self.player2), improved_score(game, self.player2))
+        player.score(game, player)
+        self.assertEqual((player.eval_cache.hits, player.eval_cache.misses), (1, 2))
+        player.get_move(game, lambda: float("inf"))
+        self.assertGreater(len(player.eval_cache), 0)
+        self.assertFalse(player._begin_turn(game.forecast_move((0, 3)).forecast_move((2, 1))))
+        self.assertTrue(player._begin_turn(game))
+        self.assertEqual(len(player.eval_cache), 0)
+
+    def test_solved_table_matches_search(self):
+        """The solved table agrees with an exhaustive alpha-beta search."""
+        from board_solver import SolvedTable, solve, write_table
+        from sample_players import null_score
+        path = self.temp_path("solved.bin")
+        write_table(path, solve(4, 3), 4, 3)
+        player = game_agent.AlphaBetaPlayer(score_fn=null_score)
+        player.time_left = lambda: float("inf")
+        game = isolation.Board(player, self.player2, 4, 3)
+        game.apply_move((1, 1))
+        game.apply_move((0, 3))
+        with SolvedTable(path) as table:
+            self.assertEqual(table.lookup(isolation.Board(1, 2, 4, 3)), -8)
+            value = table.lookup(game)
+            _, score = player.alphabeta_root(game, 12)
+            self.assertEqual(value > 0, score > 0)
+            self.assertIn(table.best_move(game), game.get_legal_moves())
+
+    def test_opening_book_covers_symmetric_positions(self):
+        """Book moves of mirrored positions are mirrored, and the player
+        plays them without searching."""
+        from opening_book import build
+        from sample_players import improved_score
+        searcher = game_agent.AlphaBetaPlayer(score_fn=improved_score)
+        with self.assertRaises(ValueError):
+            build(searcher, plies=2, time_limit=searcher.TIMER_THRESHOLD, width=4, height=4)
+        book = game_agent.OpeningBook(build(searcher, plies=2, time_limit=30, width=4, height=4))
+        empty = isolation.Board(self.player1, self.player2, 4, 4)
+        for game in [empty] + [empty.forecast_move(move) for move in empty.get_legal_moves()]:
+            self.assertIn(book.lookup(game), game.get_legal_moves())
+        player = game_agent.AlphaBetaPlayer(opening_book=book)
+        game = isolation.Board(player, self.player2, 4, 4)
+        game.apply_move((0, 1))
+        mirrored = isolation.Board(player, self.player2, 4, 4)
+        mirrored.apply_move((3, 1))
+        row, col = book.lookup(game)
+        self.assertEqual(book.lookup(mirrored), (3 - row, col))
+        self.assertEqual(player.get_move(game, lambda: 0.), (row, col))
+        self.assertIsNone(book.lookup(game.forecast_move((row, col))))
+
+    def test_mcts_reuses_subtree_of_opponent_reply(self):
+        """MCTS returns a legal move and keeps the subtree it lands in."""
+        player = game_agent.MCTSPlayer()
+        game = isolation.Board(player, self.player2, 5, 5)
+        game.apply_move((2, 2))
+        game.apply_move((0, 0))
+        budget = iter(range(500, 0, -1))
+        move = player.get_move(game, lambda: next(budget, 0))
+        self.assertIn(move, game.get_legal_moves())
+        game.apply_move(move)
+        reply = max(player._root.children.values(), key=lambda child: child.visits).move
+        game.apply_move(reply)
+        subtree = player._reuse_subtree(game)
+        self.assertIsNotNone(subtree)
+        self.assertGreater(subtree.visits, 0)
+
+    def test_mcts_returns_at_once_without_legal_moves(self):
+        """A player with no legal moves does not spend its time on playouts."""
+        player = game_agent.MCTSPlayer()
+        game = isolation.Board(player, self.player2, 3, 3)
+        game.apply_move((1, 1))
+        game.apply_move((0, 0))
+        clock = []
+        def time_left():
+            clock.append(None)
+            return 100. - len(clock)
+        self.assertEqual(player.get_move(game, time_left), (-1, -1))
+        self.assertEqual(clock, [])
+
+    def test_game_file_round_trip(self):
+        """Games written by GameWriter read back unchanged."""
+        from selfplay import GameReader, GameWriter
+        moves = [(2, 2), (0, 0), (0, 1), (1, 2), (2, 0)]
+        path = self.temp_path("games.bin")
+        with GameWriter(path, 5, 5) as writer:
+            writer.write(0, "illegal move", moves)
+            writer.write(1, "timeout", moves[:2])
+        with GameReader(path) as reader:
+            self.assertEqual(len(reader), 2)
+            self.assertEqual(reader[0], (0, "illegal move", moves))
+            self.assertEqual(reader[1].termination, "timeout")
+            self.assertEqual(len(list(reader.positions())), 7)
+
+    def test_game_writer_drops_a_torn_record(self):
+        """Reopening a file cut short mid-record realigns the records."""
+        from selfplay import GameReader, GameWriter
+        path = self.temp_path("games.bin")
+        with GameWriter(path, 5, 5) as writer:
+            writer.write(0, "illegal move", [(2, 2), (0, 0)])
+        with open(path, "ab") as game_file:
+            game_file.write(bytes([1, 2, 3]))
+        with self.assertWarns(UserWarning):
+            writer = GameWriter(path, 5, 5)
+        with writer:
+            writer.write(1, "timeout", [(1, 1)])
+        with GameReader(path) as reader:
+            self.assertEqual(list(reader), [(0, "illegal move", [(2, 2), (0, 0)]),
+                                            (1, "timeout", [(1, 1)])])
+
+    def test_selfplay_warns_when_capping_workers(self):
+        """Asking for more workers than physical cores is reported."""
+        from sample_players import RandomPlayer
+        from selfplay import GameReader, generate
+        from tournament import physical_cores
+        path = self.temp_path("games.bin")
+        with self.assertWarns(UserWarning):
+            generate(path, [RandomPlayer(), RandomPlayer()], 2,
+                     workers=physical_cores() + 1, width=4, height=4)
+        with GameReader(path) as reader:
+            self.assertEqual(len(reader), 2)
+
+    @unittest.skipUnless(find_spec("numpy"), "requires numpy")
+    def test_batch_scores_match_scalar_heuristics(self):
+        """Vectorized heuristics agree with the one-board versions."""
+        import random
+        import sample_players
+        from batch_scores import BATCH_SCORES, batch_score, pack_boards
+        rng = random.Random(1)
+        games = []
+        for _ in range(10):
+            game = isolation.Board(self.player1, self.player2)
+            while game.get_legal_moves():
+                game.apply_move(rng.choice(game.get_legal_moves()))
+                if game.move_count >= 2:
+                    games.append(game.copy())
+        for name in BATCH_SCORES:
+            score_fn = getattr(sample_players, name, None) or getattr(game_agent, name)
+            for seat, player in enumerate([self.player1, self.player2]):
+                self.assertEqual(list(batch_score(score_fn, pack_boards(games), seat)),
+                                 [score_fn(game, player) for game in games])
+
+    def test_seeded_rounds_draw_the_same_openings_in_process_and_in_pool(self):
+        """Games played in this process do not change later openings."""
+        import random
+        from concurrent.futures import ProcessPoolExecutor
+        import tournament
+        cpu, test = tournament.make_agent("Random"), tournament.make_agent("Greedy_Open")
+        openings = []
+        with ProcessPoolExecutor(2) as pool:
+            for executor in (None, pool):
+                random.seed(7)
+                records = []
+                for _ in range(2):
+                    tournament.play_round(cpu, [test], {cpu.player: 0, test.player: 0},
+                                          2, executor, width=5, height=5, records=records)
+                openings.append([record["opening"] for record in records])
+        self.assertEqual(openings[0], openings[1])
+
+    def test_journal_resume_skips_games_and_keeps_openings(self):
+        """A resumed tournament replays only the missing games, with the
+        openings of an uninterrupted run."""
+        import random
+        import tournament
+        test = tournament.make_agent("Greedy_Open")
+        cpu_agents = [tournament.make_agent("Random"), tournament.make_agent("Greedy_Null")]
+        path = self.temp_path("journal.jsonl")
+
+        def run():
+            random.seed(3)
+            records, journal = [], tournament.Journal(path, {"seed": 3})
+            for cpu in cpu_agents:
+                tournament.play_round(cpu, [test], {cpu.player: 0, test.player: 0},
+                                      2, width=5, height=5, records=records,
+                                      journal=journal)
+            return records, journal
+
+        records, _ = run()
+        with open(path) as journal_file:
+            first_round = journal_file.readlines()[:4]
+        with open(path, "w") as journal_file:
+            journal_file.writelines(first_round)
+        resumed, journal = run()
+        self.assertEqual(len(journal), 8)
+        with open(path) as journal_file:
+            self.assertEqual(len(journal_file.readlines()), 8)
+        self.assertEqual([record["opening"] for record in resumed],
+                         [record["opening"] for record in records])
+        self.assertEqual([record["history"] for record in resumed],
+                         [record["history"] for record in records])
+
+    def test_elo_estimate_and_sprt_decisions(self):
+        """Elo intervals are symmetric and bounded away from a perfect
+        score, and the SPRT decides only once the evidence is strong enough."""
+        import math
+        from tournament import SPRT, elo_estimate
+        self.assertEqual(elo_estimate(5, 10)[0], 0)
+        estimate, low, high = elo_estimate(3, 10)
+        self.assertTrue(low < estimate < 0 < high)
+        self.assertAlmostEqual(low, -elo_estimate(7, 10)[2])
+        for games in (1, 10, 100):
+            estimate, low, high = elo_estimate(0, games)
+            self.assertEqual((estimate, low), (float("-inf"), float("-inf")))
+            self.assertAlmostEqual(high, -elo_estimate(games, games)[1])
+            self.assertEqual(elo_estimate(games, games)[::2], (float("inf"),) * 2)
+        self.assertTrue(elo_estimate(0, 100)[2] < elo_estimate(0, 10)[2] < 0)
+        self.assertTrue(all(map(math.isnan, elo_estimate(0, 0))))
+
+        sprt = SPRT(elo0=-50, elo1=50, alpha=0.05, beta=0.05)
+        self.assertIsNone(sprt.decision(10, 0))
+        self.assertEqual(sprt.decision(11, 0), "H1")
+        self.assertEqual(sprt.decision(0, 11), "H0")
+        self.assertIsNone(sprt.decision(20, 20))
+        self.assertEqual(sprt.decision(21, 10), "H1")
+
+    def test_physical_cores_ignores_hyperthreads(self):
+        """Logical CPUs sharing a core id count once."""
+        from unittest import mock
+        import tournament
+        cpuinfo = "".join("processor\t: {}\nphysical id\t: 0\ncore id\t\t: {}\n\n".format(
+            cpu, cpu % 2) for cpu in range(4))
+        with mock.patch.dict("sys.modules", psutil=None), \
+                mock.patch("builtins.open", mock.mock_open(read_data=cpuinfo)):
+            with mock.patch("os.sched_getaffinity", return_value={0, 1, 2, 3}, create=True):
+                self.assertEqual(tournament.physical_cores(), 2)
+            with mock.patch("os.sched_getaffinity", return_value={0}, create=True):
+                self.assertEqual(tournament.physical_cores(), 1)
+        self.assertGreaterEqual(tournament.physical_cores(), 1)
+
+    def test_play_round_credits_the_winning_seat(self):
+        """Wins go to the right player whether games run here or in a pool."""
+        from concurrent.futures import ProcessPoolExecutor
+        import tournament
+        cpu = tournament.make_agent("Greedy_Open")
+        test = tournament.Agent(ForfeitPlayer(), "Forfeit")
+        with ProcessPoolExecutor(2) as pool:
+            for executor in (None, pool):
+                wins, records = {cpu.player: 0, test.player: 0}, []
+                tournament.play_round(cpu, [test], wins, 3, executor, width=5,
+                                      height=5, records=records)
+                self.assertEqual(wins, {cpu.player: 6, test.player: 0})
+                self.assertEqual(sorted(record["test_seat"] for record in records),
+                                 [0, 0, 0, 1, 1, 1])
+                for record in records:
+                    self.assertEqual((record["winner"], record["termination"]),
+                                     ("Greedy_Open", "forfeit"))
+
+    def test_make_agent_parses_agent_names(self):
+        """Short names, class specs with options, and unknown names."""
+        import tournament
+        from sample_players import RandomPlayer, improved_score, center_score
+        self.assertIsInstance(tournament.make_agent("Random").player, RandomPlayer)
+        agent = tournament.make_agent("AB_Improved")
+        self.assertEqual(agent.name, "AB_Improved")
+        self.assertEqual(type(agent.player).__name__, "AlphaBetaPlayer")
+        self.assertIs(agent.player.score, improved_score)
+        agent = tournament.make_agent("AlphaBetaPlayer:improved_score:search_mode=pvs,tt_size=64")
+        self.assertIs(agent.player.score, improved_score)
+        self.assertTrue(agent.player.pvs)
+        self.assertEqual(agent.player.tt.max_entries, 64)
+        player = tournament.make_agent("MinimaxPlayer:Center:search_depth=2").player
+        self.assertEqual((player.score, player.search_depth), (center_score, 2))
+        player = tournament.make_agent("AlphaBetaPlayer").player
+        self.assertEqual(player.score.__name__, "custom_score")
+        player = tournament.make_agent("AlphaBetaPlayer::move_ordering=MoveOrdering," +
+                                       "time_manager=TimeManager").player
+        self.assertEqual(type(player.move_ordering).__name__, "MoveOrdering")
+        self.assertEqual(type(player.time_manager).__name__, "TimeManager")
+        with self.assertRaises(ValueError):
+            tournament.make_agent("NoSuchPlayer")
+        with self.assertRaisesRegex(ValueError, "move_ordering=Ordering"):
+            tournament.make_agent("AlphaBetaPlayer::move_ordering=Ordering")
+
+    def test_journal_ignores_torn_lines_and_other_tournaments(self):
+        """Only complete entries from the same configuration are reloaded."""
+        from tournament import Journal
+        path = self.temp_path("journal.jsonl")
+        entry = {"cpu_agent": "Random", "test_agent": "AB_Custom", "match": 0,
+                 "test_seat": 1, "winner": "Random", "test_won": False}
+        Journal(path, {"seed": 1}).append(entry)
+        Journal(path, {"seed": 2}).append(dict(entry, match=1))
+        with open(path, "a") as journal_file:
+            journal_file.write('{"cpu_agent": "Random", "test_ag')
+        journal = Journal(path, {"seed": 1})
+        self.assertEqual(len(journal), 1)
+        self.assertEqual(journal.get(("Random", "AB_Custom", 0, 1)), entry)
+        self.assertIsNone(journal.get(("Random", "AB_Custom", 1, 1)))
+        journal.append(dict(entry, match=2))
+        self.assertEqual(len(Journal(path, {"seed": 1})), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,178 @@
+"""Vectorized versions of the built-in heuristics that score many game states
+in one call.
+
+Boards are packed into NumPy arrays with `pack_boards()`: the blocked cells
+of each board as a uint64 bitmask (bit `row + col * height`, as in
+`isolation.Board`) and the cell index of each player (-1 before the player
+has moved). Every occupied cell is blocked, so the number of moves played
+and the player to move follow from the mask. Scores are returned as float64
+arrays, with -inf and inf for lost and won states like the scalar versions,
+from the point of view of the player in seat 0 (the first player) or seat 1.
+
+    boards = pack_boards(games)
+    scores = batch_score(improved_score, boards, seat=0)
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from isolation import Board
+
+PackedBoards = namedtuple("PackedBoards", ["blocked", "p1_loc", "p2_loc", "width", "height"])
+
+# Knight-move masks per geometry, with one extra entry for index -1 (a
+# player who has not moved yet may move to any open cell)
+_move_masks = {}
+
+
+def _masks_for(width, height):
+    masks = _move_masks.get((width, height))
+    if masks is None:
+        _, cell_masks, _ = Board._knight_tables_for(width, height)
+        masks = np.array(cell_masks + ((1 << width * height) - 1,), dtype=np.uint64)
+        _move_masks[(width, height)] = masks
+    return masks
+
+
+def _popcount(masks):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).astype(np.int64)
+    bits = np.unpackbits(np.ascontiguousarray(masks).view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1, dtype=np.int64)
+
+
+def pack_boards(games):
+    """Pack a sequence of `isolation.Board` objects with the same size into
+    a PackedBoards of arrays."""
+    games = list(games)
+    width, height = games[0].width, games[0].height
+    if width * height > 64:
+        raise ValueError("Boards of more than 64 cells cannot be packed")
+    locs = lambda loc: -1 if loc == Board.NOT_MOVED else loc
+    return PackedBoards(np.array([game._blocked for game in games], dtype=np.uint64),
+                        np.array([locs(game._p1_loc) for game in games], dtype=np.int64),
+                        np.array([locs(game._p2_loc) for game in games], dtype=np.int64),
+                        width, height)
+
+
+class _Features:
+    """The quantities the heuristics are built from, computed once for a
+    batch from the point of view of one seat."""
+
+    def __init__(self, boards, seat):
+        self.boards = boards
+        masks = _masks_for(boards.width, boards.height)
+        self.own, self.opp = boards.p1_loc, boards.p2_loc
+        if seat == 1:
+            self.own, self.opp = self.opp, self.own
+        self.open_cells = ~boards.blocked
+        self.own_moves = _popcount(masks[self.own] & self.open_cells)
+        self.opp_moves = _popcount(masks[self.opp] & self.open_cells)
+        self.move_count = _popcount(boards.blocked)
+        own_to_move = self.move_count % 2 == seat
+        self.lost = own_to_move & (self.own_moves == 0)
+        self.won = ~own_to_move & (self.opp_moves == 0)
+
+    def location(self, loc):
+        """Return the rows and columns of cell indices (nan if not moved)."""
+        rows = np.where(loc < 0, np.nan, loc % self.boards.height)
+        cols = np.where(loc < 0, np.nan, loc // self.boards.height)
+        return rows, cols
+
+    def squared_distance(self, to_center=False):
+        """Return the squared distance from the own player to the opponent,
+        or to the center of the board."""
+        rows, cols = self.location(self.own)
+        if to_center:
+            other_rows, other_cols = self.boards.height / 2, self.boards.width / 2
+        else:
+            other_rows, other_cols = self.location(self.opp)
+        return (other_rows - rows) ** 2 + (other_cols - cols) ** 2
+
+    def distance(self, to_center=False):
+        """Return the distance from the own player to the opponent, or to
+        the center of the board."""
+        return np.sqrt(self.squared_distance(to_center))
+
+    def common_moves(self):
+        masks = _masks_for(self.boards.width, self.boards.height)
+        return _popcount(masks[self.own] & masks[self.opp] & self.open_cells)
+
+    def early_game(self):
+        return self.move_count / (self.boards.width * self.boards.height) < 0.30
+
+    def finish(self, scores):
+        """Apply the terminal values to an array of scores."""
+        scores = np.array(scores, dtype=np.float64)
+        scores[self.lost] = float("-inf")
+        scores[self.won] = float("inf")
+        return scores
+
+
+def batch_null_score(boards, seat=0):
+    """Vectorized `sample_players.null_score`."""
+    features = _Features(boards, seat)
+    return features.finish(np.zeros(len(boards.blocked)))
+
+
+def batch_open_move_score(boards, seat=0):
+    """Vectorized `sample_players.open_move_score`."""
+    features = _Features(boards, seat)
+    return features.finish(features.own_moves)
+
+
+def batch_improved_score(boards, seat=0):
+    """Vectorized `sample_players.improved_score`."""
+    features = _Features(boards, seat)
+    return features.finish(features.own_moves - features.opp_moves)
+
+
+def batch_center_score(boards, seat=0):
+    """Vectorized `sample_players.center_score`."""
+    features = _Features(boards, seat)
+    return features.finish(features.squared_distance(to_center=True))
+
+
+def batch_custom_score(boards, seat=0):
+    """Vectorized `game_agent.custom_score`."""
+    features = _Features(boards, seat)
+    late = (3 * (features.own_moves - features.opp_moves) + features.common_moves() +
+            features.distance())
+    return features.finish(np.where(features.early_game(), features.distance(to_center=True), late))
+
+
+def batch_custom_score_2(boards, seat=0):
+    """Vectorized `game_agent.custom_score_2`."""
+    features = _Features(boards, seat)
+    distance = features.distance()
+    return features.finish(np.where(features.early_game(), distance,
+                                    3 * features.own_moves + distance))
+
+
+def batch_custom_score_3(boards, seat=0):
+    """Vectorized `game_agent.custom_score_3`."""
+    features = _Features(boards, seat)
+    distance = features.distance()
+    return features.finish(np.where(features.early_game(), -distance,
+                                    2 * features.own_moves + distance))
+
+
+# The vectorized version of each built-in heuristic, by function name
+BATCH_SCORES = {
+    "null_score": batch_null_score,
+    "open_move_score": batch_open_move_score,
+    "improved_score": batch_improved_score,
+    "center_score": batch_center_score,
+    "custom_score": batch_custom_score,
+    "custom_score_2": batch_custom_score_2,
+    "custom_score_3": batch_custom_score_3,
+}
+
+
+def batch_score(score_fn, boards, seat=0):
+    """Score every board in a PackedBoards with the vectorized version of
+    the built-in heuristic `score_fn`, for the player in `seat`."""
+    try:
+        return BATCH_SCORES[score_fn.__name__](boards, seat)
+    except KeyError:
+        raise ValueError("No vectorized version of {}".format(score_fn.__name__)) from None
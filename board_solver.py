@@ -0,0 +1,194 @@
+"""Solve Isolation exactly on small boards and store the results in a
+memory-mapped table that players can query in constant time.
+
+`solve()` searches the complete game tree from the empty board, merging
+transpositions and symmetric positions, and records for every position reached
+the result for the player to move as a signed distance in plies: a positive
+value `d` means the player to move wins `d` plies from now with best play,
+and a value `-d` (or 0) means the player to move loses after `d` plies,
+where the winner hurries and the loser holds out as long as possible.
+
+A table file starts with a 32 byte header -- the magic bytes b"ISOLSOLV", a
+format version, the board width and height, five reserved bytes and the
+number of slots as a uint64 -- followed by an open-addressing hash table of
+9 byte slots: the position hash (uint64) and the value plus VALUE_OFFSET
+(uint8; 0 marks an empty slot). Lookups probe linearly from the slot given
+by the low bits of the hash.
+
+    python board_solver.py 4 4 solved_4x4.bin
+"""
+import argparse
+import mmap
+import os
+import struct
+
+from isolation import Board
+
+MAGIC = b"ISOLSOLV"
+VERSION = 1
+HEADER = struct.Struct("<8sBBB5xQ")
+SLOT = struct.Struct("<QB")
+VALUE_OFFSET = 128
+
+
+def solve(width, height):
+    """Solve every position reachable from the empty board.
+
+    Positions that are reflections (or, on square boards, rotations) of each
+    other have the same result and are stored once, under the smallest of
+    their `Board.hash()` values. The search walks a lightweight state that
+    updates the hash of every symmetric image incrementally.
+
+    Returns
+    -------
+    dict
+        The signed distance (see the module docstring) of each position,
+        keyed on its smallest symmetric hash.
+    """
+    moves, _, _ = Board._knight_tables_for(width, height)
+    blocked_keys, p1_keys, p2_keys, p2_to_move_key = Board._zobrist_keys_for(width, height)
+    perms = Board._symmetries_for(width, height)
+    all_cells = range(width * height)
+    results = {}
+
+    def value(blocked, locs, keys, player):
+        result = results.get(min(keys))
+        if result is not None:
+            return result
+        loc = locs[player]
+        player_keys = (p1_keys, p2_keys)[player]
+        best_win, best_loss = None, -1
+        for dest in (all_cells if loc is None else moves[loc]):
+            if (blocked >> dest) & 1:
+                continue
+            child_keys = [key ^ player_keys[perm[dest]] ^ blocked_keys[perm[dest]] ^ p2_to_move_key ^
+                          (0 if loc is None else player_keys[perm[loc]])
+                          for key, perm in zip(keys, perms)]
+            child_locs = (dest, locs[1]) if player == 0 else (locs[0], dest)
+            child = value(blocked | 1 << dest, child_locs, child_keys, 1 - player)
+            if child <= 0:  # The opponent loses from the child.
+                if best_win is None or 1 - child < best_win:
+                    best_win = 1 - child
+            elif child > best_loss:
+                best_loss = child
+        result = results[min(keys)] = best_win if best_win is not None else -(best_loss + 1)
+        return result
+
+    value(0, (None, None), [0] * len(perms), 0)
+    return results
+
+
+def write_table(path, results, width, height):
+    """Write solved positions to a table file with at most half of its
+    slots in use."""
+    num_slots = 1
+    while num_slots < 2 * len(results):
+        num_slots *= 2
+    table = bytearray(num_slots * SLOT.size)
+    for key, result in results.items():
+        slot = key & (num_slots - 1)
+        while table[slot * SLOT.size + 8]:
+            slot = (slot + 1) & (num_slots - 1)
+        SLOT.pack_into(table, slot * SLOT.size, key, result + VALUE_OFFSET)
+    with open(path, "wb") as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, width, height, num_slots))
+        table_file.write(table)
+
+
+class SolvedTable:
+    """Read-only, memory-mapped access to a table written by write_table().
+
+    Parameters
+    ----------
+    path : str
+        The table file.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as table_file:
+            magic, version, self.width, self.height, self._num_slots = \
+                HEADER.unpack(table_file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("{} is not a solved position table".format(path))
+            self._map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def lookup(self, game):
+        """
+        Description: Look up the exact result of a position.
+
+        :param game: (isolation.Board) A board of the table's size.
+        :return: (int) Signed distance in plies for the player to move (positive for a win), or None if the position is not in the table.
+        """
+        if (game.width, game.height) != (self.width, self.height):
+            return None
+        key = min(game.symmetric_hashes())
+        mask = self._num_slots - 1
+        slot = key & mask
+        while True:
+            stored, value = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+            if not value:
+                return None
+            if stored == key:
+                return value - VALUE_OFFSET
+            slot = (slot + 1) & mask
+
+    def best_move(self, game):
+        """
+        Description: Choose the move that wins fastest, or loses slowest.
+
+        :param game: (isolation.Board) A board of the table's size.
+        :return: (tuple) The best move, (-1, -1) if there are no legal moves, or None if a successor is not in the table.
+        """
+        best_move, best_key = (-1, -1), None
+        for move in game.get_legal_moves():
+            child = self.lookup(game.forecast_move(move))
+            if child is None:
+                return None
+            # Wins before losses; the smaller value is better either way.
+            value = 1 - child if child <= 0 else -(child + 1)
+            key = (value <= 0, value)
+            if best_key is None or key < best_key:
+                best_move, best_key = move, key
+        return best_move
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TablePlayer:
+    """Player that plays perfectly from a SolvedTable, for use as an oracle
+    opponent when testing agents on small boards."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def get_move(self, game, time_left):
+        return self.table.best_move(game)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve Isolation on a small " +
+                                     "board and write the results to a table file.")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("output", help="table file to write")
+    args = parser.parse_args()
+
+    results = solve(args.width, args.height)
+    write_table(args.output, results, args.width, args.height)
+    wins = sum(1 for value in results.values() if value > 0)
+    print("{} positions ({} won by the player to move), {} bytes".format(
+        len(results), wins, os.path.getsize(args.output)))
+    with SolvedTable(args.output) as table:
+        first = table.lookup(Board("player 1", "player 2", args.width, args.height))
+    print("First player {} in {} plies".format("wins" if first > 0 else "loses", abs(first)))
+
+
+if __name__ == "__main__":
+    main()
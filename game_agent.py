@@ -2,7 +2,14 @@
 test your agent's strength against a set of known agents using tournament.py
 and include the results in your report.
 """
-from math import sqrt
+import random
+
+from collections import OrderedDict
+from math import log, sqrt
+
+NULL_WINDOW = 1e-6  # Width of the PVS scout window (scores are floats).
+PONDER_OPPONENT = "opponent"  # Placeholder opponent on the boards a pondering worker searches.
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -23,6 +30,25 @@ def get_distance_between_2_points(current_player_location, enemy_player_location
         return sqrt(((enemy_player_y - current_player_y) ** 2) + ((enemy_player_x - current_player_x) ** 2))
     return -1 * sqrt(((enemy_player_y - current_player_y) ** 2) + ((enemy_player_x - current_player_x) ** 2))
 
+def _terminal_score(game, player):
+    '''
+        Description: Score a finished game for the given player. Boards that provide `terminal_status()` answer with one call; the project reviewers run this file against the original `isolation.Board`, which only has `is_loser()` and `is_winner()`, so fall back to those.
+        :param game: (isolation.Board) Isolation game object.
+        :param player: (object) The player to score the position for.
+        :return: (float) inf if the player has won, -inf if it has lost, or None if the game is not over.
+    '''
+    terminal_status = getattr(game, "terminal_status", None)
+    if terminal_status is None:
+        if game.is_loser(player):
+            return float("-inf")
+        if game.is_winner(player):
+            return float("inf")
+        return None
+    winner = terminal_status()
+    if winner is None:
+        return None
+    return float("inf") if winner == player else float("-inf")
+
 def custom_score(game, player):
     """Description: Calculate the heuristic value of a game state from the point of view of the given player.
 
@@ -48,11 +74,9 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    terminal = _terminal_score(game, player)
+    if terminal is not None:
+        return terminal
 
     moves_total_spaces_ratio = game.move_count / (game.height * game.width)
     if moves_total_spaces_ratio < 0.30:
@@ -84,11 +108,9 @@ def custom_score_2(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    terminal = _terminal_score(game, player)
+    if terminal is not None:
+        return terminal
 
     moves_total_spaces_ratio = game.move_count / (game.height * game.width)
     if moves_total_spaces_ratio < 0.30:
@@ -119,11 +141,9 @@ def custom_score_3(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    terminal = _terminal_score(game, player)
+    if terminal is not None:
+        return terminal
 
     moves_total_spaces_ratio = game.move_count / (game.height * game.width)
     if moves_total_spaces_ratio < 0.30:
@@ -132,6 +152,548 @@ def custom_score_3(game, player):
     return 2*len(my_moves) + get_distance_between_2_points(game.get_player_location(player), game.get_player_location(game.get_opponent(player)), True)
 
 
+class TranspositionTable:
+    """Bounded-memory transposition table keyed on `Board.hash()`.
+
+    Entries live in a fixed number of slots (key modulo `max_entries`) and
+    record the search depth, bound type, score and best move found for a
+    position. When two positions map to the same slot, the "depth" policy
+    keeps the entry searched to the greater depth (entries left over from an
+    earlier search are always replaced), while the "always" policy keeps the
+    most recent entry.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        The maximum number of positions held in the table.
+
+    replacement : str (optional)
+        The eviction policy for occupied slots, "depth" or "always".
+    """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    def __init__(self, max_entries=2**16, replacement="depth"):
+        if replacement not in ("depth", "always"):
+            raise ValueError("replacement must be 'depth' or 'always', not {!r}".format(replacement))
+        self.max_entries = max_entries
+        self.replacement = replacement
+        self.clear()
+
+    def clear(self):
+        """Remove every entry and reset the search counters."""
+        self._slots = [None] * self.max_entries
+        self._generation = 0
+        self.new_search()
+
+    def new_search(self):
+        """Start a new search: reset the counters and mark the existing
+        entries as replaceable under the depth-preferred policy.
+        """
+        self._generation += 1
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.stores = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of probes in the current search that found an entry."""
+        return self.hits / self.probes if self.probes else 0.
+
+    def probe(self, key):
+        """
+        Description: Look up the entry stored for a position.
+
+        :param key: (int) Position hash from `Board.hash()`.
+        :return: (tuple) (depth, flag, score, move) for the position, or None if it is not in the table.
+        """
+        self.probes += 1
+        entry = self._slots[key % self.max_entries]
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry[1:5]
+
+    def store(self, key, depth, flag, score, move):
+        """
+        Description: Record the result of searching a position, subject to the replacement policy.
+
+        :param key: (int) Position hash from `Board.hash()`.
+        :param depth: (int) Depth the position was searched to.
+        :param flag: (int) EXACT, LOWER (score is a lower bound) or UPPER (score is an upper bound).
+        :param score: (float) Score of the position from the searching player's point of view.
+        :param move: (tuple of 2 integers) Best move found in the position, or None.
+        """
+        slot = key % self.max_entries
+        entry = self._slots[slot]
+        if (entry is not None and self.replacement == "depth" and entry[0] != key
+                and entry[5] == self._generation and entry[1] > depth):
+            return
+        self._slots[slot] = (key, depth, flag, score, move, self._generation)
+        self.stores += 1
+
+
+class MoveOrdering:
+    """Move-ordering stage for alpha-beta search that tries the previous
+    iteration's principal-variation move first, then the killer moves for the
+    current ply, then the remaining moves by descending history score.
+
+    An instance keeps per-search state, so it must not be shared between
+    players.
+
+    Parameters
+    ----------
+    num_killers : int (optional)
+        The number of killer moves remembered for each ply.
+    """
+
+    def __init__(self, num_killers=2):
+        self.num_killers = num_killers
+        self._root_move_count = 0
+        self._killers = []
+        self._history = ({}, {})
+        self._pv_moves = {}
+        self._previous_pv_moves = {}
+
+    def new_search(self, game):
+        """Forget the killer moves, history scores and PV moves of the last
+        call to get_move.
+        """
+        self._root_move_count = game.move_count
+        self._killers = []
+        self._history = ({}, {})
+        self._pv_moves = {}
+        self._previous_pv_moves = {}
+
+    def new_iteration(self, game):
+        """Start an iterative-deepening iteration rooted at `game`, promoting
+        the PV moves recorded by the previous iteration.
+        """
+        self._root_move_count = game.move_count
+        if self._pv_moves:
+            self._previous_pv_moves = self._pv_moves
+            self._pv_moves = {}
+
+    def order(self, game, moves, hint=None):
+        """
+        Description: Sort the legal moves of a node in place, best candidates first.
+
+        :param game: (isolation.Board) Isolation game object at the node.
+        :param moves: (list of tuples) Legal moves of the active player.
+        :param hint: (tuple of 2 integers) Best move suggested by another source (e.g., the transposition table), tried first; defaults to the previous iteration's PV move.
+        :return: (list of tuples) The same list, reordered.
+        """
+        if hint is None:
+            hint = self._previous_pv_moves.get(game.hash())
+        ply = game.move_count - self._root_move_count
+        killers = self._killers[ply] if ply < len(self._killers) else ()
+        history = self._history[game.move_count & 1]
+        moves.sort(key=lambda move: (move == hint, move in killers, history.get(move, 0)), reverse=True)
+        return moves
+
+    def record_best(self, game, move):
+        """Record the best move of a node whose score fell inside the search
+        window (i.e., a node on the principal variation).
+        """
+        self._pv_moves[game.hash()] = move
+
+    def record_cutoff(self, game, move, depth):
+        """Record a move that caused a cutoff as a killer for its ply and
+        credit it in the history table.
+        """
+        ply = game.move_count - self._root_move_count
+        while len(self._killers) <= ply:
+            self._killers.append([])
+        killers = self._killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.num_killers:]
+        history = self._history[game.move_count & 1]
+        history[move] = history.get(move, 0) + depth * depth
+
+
+class SearchStats:
+    """Per-move search statistics for an `IsolationPlayer`.
+
+    The counters describe the most recent call to `get_move()`: nodes
+    visited, leaf evaluations, the deepest completed search iteration,
+    beta cutoffs, time spent in the score function and in move generation,
+    how late the timer check caught the search timeout, and whether the
+    move came from the interrupted iteration (`partial_moves`). Evaluation
+    cache hits and misses (when the player has a cache) cover the game so
+    far. Each record can also be appended to a file as one JSON object per
+    line.
+
+    Parameters
+    ----------
+    log_path : str (optional)
+        File to append one JSON record per call to `get_move()`.
+    """
+
+    def __init__(self, log_path=None):
+        # json and timeit are imported lazily -- the project assistant sandbox
+        # does not allow them
+        from timeit import default_timer
+        self._timer = default_timer
+        self.log_path = log_path
+        self.moves = 0
+        self.begin()
+
+    def begin(self):
+        """Reset the counters at the start of a call to `get_move()`."""
+        self.nodes = 0
+        self.leaf_evaluations = 0
+        self.depth = 0
+        self.cutoffs = 0
+        self.score_time = 0.
+        self.movegen_time = 0.
+        self.timeout_overshoot = None
+        self.time_left = None
+        self.tt_probes = None
+        self.tt_hits = None
+        self.eval_cache_hits = None
+        self.eval_cache_misses = None
+        self.partial_moves = 0
+        self._start = self._timer()
+        self.elapsed = 0.
+
+    def end(self, player):
+        """Finish the record for a call to `get_move()` and log it."""
+        self.elapsed = 1000 * (self._timer() - self._start)
+        self.time_left = player.time_left()
+        tt = getattr(player, "tt", None)
+        if tt is not None:
+            self.tt_probes, self.tt_hits = tt.probes, tt.hits
+        if player.eval_cache is not None:
+            self.eval_cache_hits = player.eval_cache.hits
+            self.eval_cache_misses = player.eval_cache.misses
+        self.moves += 1
+        if self.log_path is not None:
+            import json
+            with open(self.log_path, "a") as log_file:
+                log_file.write(json.dumps(self.as_dict()) + "\n")
+
+    @property
+    def nodes_per_second(self):
+        """Nodes visited per second of search in the last call."""
+        return 1000 * self.nodes / self.elapsed if self.elapsed else 0.
+
+    def as_dict(self):
+        """Return the record for the last call to `get_move()` as a dict
+        (times in milliseconds).
+        """
+        return {"move": self.moves, "nodes": self.nodes,
+                "leaf_evaluations": self.leaf_evaluations, "depth": self.depth,
+                "cutoffs": self.cutoffs, "score_ms": 1000 * self.score_time,
+                "movegen_ms": 1000 * self.movegen_time, "elapsed_ms": self.elapsed,
+                "nps": self.nodes_per_second,
+                "timeout_overshoot_ms": self.timeout_overshoot,
+                "time_left_ms": self.time_left, "tt_probes": self.tt_probes,
+                "tt_hits": self.tt_hits, "eval_cache_hits": self.eval_cache_hits,
+                "eval_cache_misses": self.eval_cache_misses,
+                "partial_moves": self.partial_moves}
+
+    def evaluate(self, player, game):
+        """Call `player.score()` on a leaf, timing and counting it."""
+        start = self._timer()
+        value = player.score(game, player)
+        self.score_time += self._timer() - start
+        self.leaf_evaluations += 1
+        return value
+
+    def generate_moves(self, game):
+        """Call `game.get_legal_moves()`, timing it."""
+        start = self._timer()
+        moves = game.get_legal_moves()
+        self.movegen_time += self._timer() - start
+        return moves
+
+
+class EvaluationCache:
+    """Size-bounded cache of leaf evaluations that wraps a score function.
+
+    Iterative deepening evaluates many of the same leaves again at each
+    depth, so the cache remembers the most recently used `max_entries`
+    scores keyed on `Board.hash()` and the seat of the scored player, and
+    evicts the least recently used entry when it is full. The wrapped
+    function must depend only on the position, as the built-in heuristics
+    do.
+
+    Parameters
+    ----------
+    score_fn : callable
+        The heuristic to cache, called as `score_fn(game, player)`.
+
+    max_entries : int (optional)
+        The maximum number of scores held in the cache.
+    """
+
+    def __init__(self, score_fn, max_entries=2**16):
+        self.score_fn = score_fn
+        self.max_entries = max_entries
+        self._scores = OrderedDict()
+        self.clear()
+
+    def clear(self):
+        """Remove every entry and reset the hit and miss counters."""
+        self._scores.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._scores)
+
+    @property
+    def hit_rate(self):
+        """Fraction of evaluations since the last clear() served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def __call__(self, game, player):
+        """
+        Description: Return `score_fn(game, player)`, computing it only if the position is not in the cache.
+
+        :param game: (isolation.Board) Isolation game object.
+        :param player: (object) The player to score the position for.
+        :return: (float) The heuristic value of the position for the player.
+        """
+        key = (game.hash(), game.move_count % 2 ^ (player != game.active_player))
+        scores = self._scores
+        score = scores.get(key)
+        if score is not None:
+            self.hits += 1
+            scores.move_to_end(key)
+            return score
+        self.misses += 1
+        score = self.score_fn(game, player)
+        scores[key] = score
+        if len(scores) > self.max_entries:
+            scores.popitem(last=False)
+        return score
+
+
+class EndgameSolver:
+    """Exact solver for partitioned endgames.
+
+    Once no open cell is reachable by both players (see
+    `Board.is_partitioned()`), the game is two independent longest-path
+    problems: the player to move wins exactly when their longest path is
+    longer than the opponent's. The solver computes both paths with
+    `Board.longest_path()`, memoizing subresults across calls, and gives up
+    on positions that need more than `max_nodes` new expansions (progress is
+    kept in the memo, so a later attempt resumes where it stopped).
+
+    Parameters
+    ----------
+    max_nodes : int (optional)
+        The node budget of each longest-path search.
+
+    min_moves : int (optional)
+        Only test for a partition once this many moves have been played,
+        since the flood fill is wasted effort in the opening.
+
+    max_entries : int (optional)
+        Clear the memo when it grows beyond this many entries.
+    """
+
+    def __init__(self, max_nodes=1000, min_moves=12, max_entries=2**16):
+        self.max_nodes = max_nodes
+        self.min_moves = min_moves
+        self.max_entries = max_entries
+        self._memo = {}
+        self._geometry = None
+        self.solved = 0
+        self.aborted = 0
+
+    def solve(self, game):
+        """
+        Description: Solve a partitioned position exactly. The player with the smaller region is solved first, which usually bounds the other search: a region with fewer cells than the first path length cannot hold a longer path, and otherwise the second search stops as soon as it finds a path long enough to decide the game.
+
+        :param game: (isolation.Board) Isolation game object.
+        :return: (tuple) Score for the player to move (inf for a win, -inf for a loss) and the first move of that player's longest path, or None if the position is not partitioned, is already over or could not be solved within the node budget.
+        """
+        if game.move_count < self.min_moves:
+            return None
+        own, opp = game.active_player, game.inactive_player
+        own_region, opp_region = game.reachable_mask(own), game.reachable_mask(opp)
+        if own_region & opp_region or not own_region:
+            return None  # Not partitioned, or the player to move has already lost.
+        if self._geometry != (game.width, game.height) or len(self._memo) > self.max_entries:
+            self._memo = {}
+            self._geometry = (game.width, game.height)
+
+        memo, max_nodes = self._memo, self.max_nodes
+        own_cells, opp_cells = bin(own_region).count("1"), bin(opp_region).count("1")
+        if own_cells <= opp_cells:
+            own_path = game.longest_path(own, memo, max_nodes)
+            opp_path = None
+            if own_path is not None:
+                opp_path = (0, None) if opp_cells < own_path[0] else \
+                    game.longest_path(opp, memo, max_nodes, target=own_path[0])
+        else:
+            opp_path = game.longest_path(opp, memo, max_nodes)
+            own_path = None
+            if opp_path is not None:
+                own_path = game.longest_path(own, memo, max_nodes, target=opp_path[0] + 1)
+        if own_path is None or opp_path is None:
+            self.aborted += 1
+            return None
+        self.solved += 1
+        return float("inf") if own_path[0] > opp_path[0] else float("-inf"), own_path[1]
+
+
+class OpeningBook:
+    """Precomputed moves for the first plies of a game, as written by
+    `opening_book.py`.
+
+    Each position is stored once for all of its reflections and rotations,
+    keyed on the smallest of its `Board.symmetric_hashes()` (in hex), with
+    the move in the frame of the symmetry that produced that key, so a
+    lookup costs one dictionary probe plus a handful of hash updates.
+
+    Parameters
+    ----------
+    data : dict
+        The decoded book: the board "width" and "height", the number of
+        "plies" it covers, and the cell index of the book move of each
+        position under "moves".
+    """
+
+    def __init__(self, data):
+        self.width = data["width"]
+        self.height = data["height"]
+        self.plies = data["plies"]
+        self.moves = data["moves"]
+        self.hits = 0
+
+    @classmethod
+    def load(cls, path):
+        """Read a book from a JSON file (e.g., the competition's data.json)."""
+        import json
+        with open(path) as book_file:
+            return cls(json.load(book_file))
+
+    def __len__(self):
+        return len(self.moves)
+
+    def lookup(self, game):
+        """
+        Description: Find the book move of a position.
+
+        :param game: (isolation.Board) Isolation game object.
+        :return: (tuple) The book move, or None if the position is not in the book.
+        """
+        if game.move_count >= self.plies or (game.width, game.height) != (self.width, self.height):
+            return None
+        hashes = game.symmetric_hashes()
+        key = min(hashes)
+        idx = self.moves.get(format(key, "x"))
+        if idx is None:
+            return None
+        perm = game.symmetries()[hashes.index(key)]
+        idx = perm.index(idx)  # Map the move back from the canonical frame.
+        move = (idx % self.height, idx // self.height)
+        if move not in game.get_legal_moves():
+            return None
+        self.hits += 1
+        return move
+
+
+class TimeManager:
+    """Budget the time of each move and stop iterative deepening before an
+    iteration that cannot finish.
+
+    An iteration interrupted by the timer is wasted work, so after each
+    completed iteration the manager predicts the cost of the next one: the
+    nodes of the last iteration times their growth over the iteration
+    before, at the node rate measured so far this move. The next iteration
+    is only started if it is predicted to finish within the budget, and
+    never once the depth covers every open cell (deeper searches cannot
+    change the result).
+
+    By default the budget is all the time available for the move. It can
+    also be scaled by the game phase and by the complexity of the position
+    (the number of legal moves of the player to move, up to `busy_moves`),
+    so quiet positions and the shallow trees of the endgame return early;
+    these weights are 1 unless given, since saving time on one move only
+    helps when the time limit is shared between moves.
+
+    Parameters
+    ----------
+    phase_weights : (float, float, float) (optional)
+        Fraction of the available time to use in the opening, the
+        middlegame and the endgame.
+
+    phase_bounds : (float, float) (optional)
+        Fraction of the board occupied at which the middlegame and the
+        endgame begin.
+
+    busy_moves : int (optional)
+        Number of legal moves at which a position gets the full budget of
+        its phase; positions with fewer moves get proportionally less, down
+        to `quiet_weight`.
+
+    min_growth : float (optional)
+        Smallest node growth factor assumed between iterations (transposition
+        table hits can make an iteration look cheaper than the next will be).
+
+    quiet_weight : float (optional)
+        Fraction of the budget of its phase used in a position without
+        legal moves.
+    """
+
+    def __init__(self, phase_weights=(1., 1., 1.), phase_bounds=(0.15, 0.6),
+                 busy_moves=6, min_growth=1.5, quiet_weight=1.):
+        self.phase_weights = phase_weights
+        self.phase_bounds = phase_bounds
+        self.busy_moves = busy_moves
+        self.min_growth = min_growth
+        self.quiet_weight = quiet_weight
+        self.budget = 0.
+        self.declined = 0
+
+    def start(self, game, time_left, reserve):
+        """
+        Description: Set the budget for a new move.
+
+        :param game: (isolation.Board) Isolation game object at the root of the search.
+        :param time_left: (callable) The timer of the move, in milliseconds.
+        :param reserve: (float) Milliseconds to keep in hand (the player's TIMER_THRESHOLD).
+        """
+        self._time_left = time_left
+        self._start = time_left()
+        occupied = game.move_count / (game.width * game.height)
+        phase = sum(occupied >= bound for bound in self.phase_bounds)
+        complexity = min(1., len(game.get_legal_moves()) / self.busy_moves)
+        self.budget = ((self._start - reserve) * self.phase_weights[phase] *
+                       (self.quiet_weight + (1 - self.quiet_weight) * complexity))
+        self._open_cells = len(game.get_blank_spaces())
+        self._nodes = 0
+        self._iteration_nodes = 0
+
+    def next_iteration(self, depth, nodes):
+        """
+        Description: Decide whether to search the next depth after an iteration completes.
+
+        :param depth: (int) The depth just completed.
+        :param nodes: (int) Nodes visited so far this move.
+        :return: (bool) True if the search should go on to depth + 1.
+        """
+        iteration_nodes, previous = nodes - self._nodes, self._iteration_nodes
+        self._nodes, self._iteration_nodes = nodes, iteration_nodes
+        if depth >= self._open_cells:
+            return False
+        elapsed = self._start - self._time_left()
+        growth = max(self.min_growth, iteration_nodes / previous if previous else self.min_growth)
+        predicted = iteration_nodes * growth * elapsed / nodes if nodes else 0.
+        if elapsed + predicted > self.budget:
+            self.declined += 1
+            return False
+        return True
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -161,7 +723,204 @@ class IsolationPlayer:
         self.TIMER_THRESHOLD = timeout
 
 
-class MinimaxPlayer(IsolationPlayer):
+class SearchMixin:
+    """Per-turn bookkeeping shared by the search agents, mixed in ahead of
+    `IsolationPlayer`: search statistics, the evaluation cache, and noticing
+    when a call to get_move() starts a new game.
+
+    Parameters
+    ----------
+    stats : bool (optional)
+        If True, record a `SearchStats` for each call to get_move() in
+        `self.stats` (None when disabled).
+
+    stats_log : str (optional)
+        File to append the statistics of each move to as JSON lines;
+        implies `stats=True`.
+
+    eval_cache : int (optional)
+        If positive, wrap `score_fn` in an `EvaluationCache` of this many
+        entries, kept in `self.eval_cache` and cleared at the start of each
+        game; 0 (the default) calls `score_fn` directly.
+
+    The other parameters are those of `IsolationPlayer`.
+    """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 stats=False, stats_log=None, eval_cache=0):
+        super().__init__(search_depth=search_depth, score_fn=score_fn, timeout=timeout)
+        self.eval_cache = EvaluationCache(score_fn, eval_cache) if eval_cache else None
+        if self.eval_cache is not None:
+            self.score = self.eval_cache
+        self.stats = SearchStats(stats_log) if stats or stats_log else None
+        self._last_turn = None
+
+    def _begin_turn(self, game):
+        """
+        Description: Note the start of a call to get_move and report whether it begins a new game, clearing the evaluation cache if so. A turn belongs to the same game as the previous one only when it is played from the same seat at a later move count.
+
+        :param game: (isolation.Board) Isolation game object at the root of the search.
+        :return: (bool) True if this is the first turn seen of a new game.
+        """
+        seat = game.move_count % 2
+        new_game = (self._last_turn is None or self._last_turn[0] != seat or
+                    self._last_turn[1] >= game.move_count)
+        self._last_turn = (seat, game.move_count)
+        if new_game and self.eval_cache is not None:
+            self.eval_cache.clear()
+        return new_game
+
+
+class NegamaxMixin(SearchMixin):
+    """The negamax search kernel of the minimax and alpha-beta agents, mixed
+    in ahead of `IsolationPlayer`, with the state it keeps between nodes:
+    the node count, the optional transposition table, move ordering and
+    endgame solver, and the root bookkeeping of the current iteration.
+
+    Parameters
+    ----------
+    in_place : bool (optional)
+        If True, search walks the game tree on a single private copy of the
+        board using `Board.make_move()`/`Board.undo_move()` instead of
+        allocating a new board per node with `Board.forecast_move()`.
+
+    The other parameters are those of `SearchMixin`.
+    """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 in_place=False, stats=False, stats_log=None, eval_cache=0):
+        super().__init__(search_depth=search_depth, score_fn=score_fn,
+                         timeout=timeout, stats=stats, stats_log=stats_log,
+                         eval_cache=eval_cache)
+        self.in_place = in_place
+        self.tt = None
+        self.move_ordering = None
+        self.endgame = None
+        self.pvs = False
+        self.nodes = 0
+        # Root depth, window and (score, move) of each fully searched root
+        # move of the current alpha-beta iteration; see negamax()
+        self._root_depth, self._root_alpha, self._root_results = None, None, []
+
+    def negamax(self, game, depth, alpha=None, beta=None, color=1):
+        """
+        Description: Negamax search kernel shared by the minimax and alpha-beta agents. Scores are taken from the point of view of the player to move (`color` is 1 when that is this agent and -1 otherwise), so a child's score is negated instead of alternating max and min branches. Without a window this is plain depth-limited minimax; with one it is fail-soft alpha-beta, optionally using the agent's transposition table, move ordering and principal variation search.
+
+        :param game: (isolation.Board) Isolation game object.
+        :param depth: (int) Number of levels to traverse.
+        :param alpha: (float) Lower bound of the search window, or None to search without pruning.
+        :param beta: (float) Upper bound of the search window (ignored without alpha).
+        :param color: (int) 1 if this agent is the player to move, -1 otherwise.
+        :return: (tuple) Score of the game state for the player to move, and the principal variation (tuple of moves) from this state; a score at or below alpha is an upper bound and a score at or above beta is a lower bound.
+        """
+        stats = self.stats
+        time_left = self.time_left()
+        if time_left < self.TIMER_THRESHOLD:
+            if stats is not None:
+                stats.timeout_overshoot = self.TIMER_THRESHOLD - time_left
+            raise SearchTimeout()
+
+        self.nodes += 1
+        if stats is not None:
+            stats.nodes += 1
+
+        if self.endgame is not None and depth > 0:  # Leaves are left to the score function; a flood fill there costs more than it saves.
+            solved = self.endgame.solve(game)
+            if solved is not None:  # Partitioned endgame: the exact result ends the search here.
+                return solved[0], solved[1:]
+
+        if depth == 0:  # Depth limit reached; return the score.
+            return color * (self.score(game, self) if stats is None else stats.evaluate(self, game)), ()
+
+        prune = alpha is not None
+        tt = self.tt
+        tt_move = None
+        if tt is not None:
+            key = game.hash()
+            entry = tt.probe(key)
+            if entry is not None:
+                tt_move = entry[3]
+                if entry[0] >= depth:  # The stored result is at least as deep as this search.
+                    flag, score = entry[1], entry[2]
+                    if flag == TranspositionTable.EXACT:
+                        tt.cutoffs += 1
+                        return score, (tt_move,)
+                    if prune:
+                        if flag == TranspositionTable.LOWER:
+                            alpha = max(alpha, score)
+                        else:
+                            beta = min(beta, score)
+                        if alpha >= beta:
+                            tt.cutoffs += 1
+                            return score, (tt_move,)
+
+        legal_moves = game.get_legal_moves() if stats is None else stats.generate_moves(game)
+
+        if not legal_moves:  # Leaf or dead end. Return Score.
+            return color * (self.score(game, self) if stats is None else stats.evaluate(self, game)), ()
+
+        ordering = self.move_ordering
+        if ordering is not None:
+            ordering.order(game, legal_moves, tt_move)
+
+        original_alpha = alpha
+        scout = self.pvs and prune
+        in_place = self.in_place
+        at_root = depth == self._root_depth  # Only the root is searched to the root depth.
+        best_score, best_pv = float("-inf"), None
+        for move in legal_moves:
+            if in_place:
+                game.make_move(move)
+                child = game
+            else:
+                child = game.forecast_move(move)
+
+            if not prune:
+                score, pv = self.negamax(child, depth - 1, None, None, -color)
+                score = -score
+            else:
+                score = None
+                if scout and best_pv is not None and alpha + NULL_WINDOW > alpha:
+                    # Scout with a null window just above alpha (scores are floats, so it cannot be zero-width).
+                    score, pv = self.negamax(child, depth - 1, -alpha - NULL_WINDOW, -alpha, -color)
+                    score = -score
+                    if alpha < score < beta:
+                        score = None  # The move beats alpha without a cutoff; re-search with the full window.
+                if score is None:
+                    score, pv = self.negamax(child, depth - 1, -beta, -alpha, -color)
+                    score = -score
+
+            if in_place:
+                game.undo_move()
+            if at_root:
+                self._root_results.append((score, move))
+
+            if best_pv is None or score > best_score:
+                best_score, best_pv = score, (move,) + pv
+                if prune:
+                    if best_score >= beta:
+                        if stats is not None:
+                            stats.cutoffs += 1
+                        break  # prune (terminate early)
+                    if best_score > alpha:
+                        alpha = best_score
+
+        if ordering is not None:
+            if prune and best_score >= beta:
+                ordering.record_cutoff(game, best_pv[0], depth)
+            elif not prune or original_alpha < best_score:
+                ordering.record_best(game, best_pv[0])
+
+        if tt is not None:  # Fail-soft bounds: a score outside the original window only bounds the true value.
+            if prune and best_score <= original_alpha:
+                flag = TranspositionTable.UPPER
+            elif prune and best_score >= beta:
+                flag = TranspositionTable.LOWER
+            else:
+                flag = TranspositionTable.EXACT
+            tt.store(key, depth, flag, best_score, best_pv[0])
+        return best_score, best_pv
+
+
+class MinimaxPlayer(NegamaxMixin, IsolationPlayer):
     """Game-playing agent that chooses a move using depth-limited minimax
     search. You must finish and test this player to make sure it properly uses
     minimax to return a good move before the search time limit expires.
@@ -196,6 +955,9 @@ class MinimaxPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        if self.stats is not None:
+            self.stats.begin()
+        self._begin_turn(game)
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
@@ -204,11 +966,16 @@ class MinimaxPlayer(IsolationPlayer):
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(game, self.search_depth)
+            if self.stats is not None:
+                self.stats.depth = self.search_depth
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
+        if self.stats is not None:
+            self.stats.end(self)
+
         # Return the best move from the last completed search iteration
         return best_move
 
@@ -251,62 +1018,104 @@ class MinimaxPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        if self.in_place:
+            game = game.copy() # search on a private board so the caller's state is never left mid-tree.
 
-        legal_moves = game.get_legal_moves()
-
-        if not legal_moves:
+        _, principal_variation = self.negamax(game, depth)
+        if not principal_variation:
             return (-1, -1) # no valid moves (lose game)
+        return principal_variation[0] # the first move of the principal variation has the highest score
 
-        legal_move_to_score_map = {} # get the score of each legal move {legal_move1: score1, legal_move2: score2, etc...}
-        for legal_move in legal_moves:
-            legal_move_to_score_map[legal_move] = MinimaxPlayer.minimax_recursion_helper(self, game.forecast_move(legal_move), depth-1, False)
-        best_move = max(legal_move_to_score_map, key=lambda k: legal_move_to_score_map[k])
-        return best_move # return the move with the highest score
-
-    def minimax_recursion_helper(self, game, depth, is_maximizing_player):
-        """
-        Description: This helper function implements the recursive portion of the minimax algorithm from the text. When called from the minimax function, minimax_recursion_helper will return the score associated with the best_move to take from the root.
-
-        :param self: (MinimaxPlayer) Minimax player object.
-        :param game: (isolation.Board) Isolation game object.
-        :param depth: (int) num levels to traverse.
-        :param is_maximizing_player: (boolean) True if maximizer node; False if minimizer node.
-        :return: score value (float): Score associated with game state.
-        """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout() # Raise if time is exceeded.
-
-        if depth == 0:  # Get the score once the depth has reached the limit.
-            return self.score(game, self)
 
-        legal_moves = game.get_legal_moves()
-
-        if not legal_moves:  # Get the score if no legal moves (i.e., leaf or dead end).
-            return self.score(game, self)
-
-        if is_maximizing_player:  # based on Wikipedia example code. Recursive Minimax.
-            best_move_score = float("-inf")
-            for child_node_move in legal_moves:  # for each child node, call minimizer.
-                child_node_move_score = MinimaxPlayer.minimax_recursion_helper(self, game.forecast_move(child_node_move), depth - 1, False)
-                best_move_score = max(best_move_score, child_node_move_score)
-            return best_move_score
-
-        else:  # minimizer
-            best_move_score = float("inf")
-            for child_node_move in legal_moves: # for each child node, call maximizer.
-                child_node_move_score = MinimaxPlayer.minimax_recursion_helper(self, game.forecast_move(child_node_move), depth - 1, True)
-                best_move_score = min(best_move_score, child_node_move_score)
-            return best_move_score
-
-
-class AlphaBetaPlayer(IsolationPlayer):
+class AlphaBetaPlayer(NegamaxMixin, IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    tt_size : int (optional)
+        Maximum number of entries in the transposition table; 0 disables the
+        table. The table persists across the iterations of one search.
+
+    tt_replacement : str (optional)
+        Transposition table eviction policy, "depth" or "always".
+
+    tt_persist : bool (optional)
+        If True, keep the transposition table across the turns of a game
+        (it is still cleared whenever a new game is detected).
+
+    move_ordering : object (optional)
+        A move-ordering stage such as `MoveOrdering()` used to sort the moves
+        at each node; None searches moves in the order `Board` generates them.
+
+    search_mode : str (optional)
+        "alphabeta" for plain alpha-beta, or "pvs" for principal variation
+        search, which searches every move after the first at each node with a
+        null window and re-searches only the moves that beat it.
+
+    aspiration_window : float (optional)
+        If positive, each iterative-deepening iteration after the first starts
+        with a window of this half-width around the previous iteration's
+        score, widening it and re-searching on a fail-low or fail-high.
+
+    endgame_solver : object (optional)
+        An `EndgameSolver()` that scores partitioned positions exactly. With
+        a solver, iterative deepening also stops as soon as the root score
+        is a proven win or loss.
+
+    opening_book : OpeningBook or str (optional)
+        A book (or the path of a book file) to play from before searching;
+        positions outside the book are searched as usual.
+
+    time_manager : object (optional)
+        A `TimeManager()` that budgets each move and stops iterative
+        deepening before an iteration it predicts cannot finish; None
+        deepens until the timer expires.
+
+    partial_results : bool (optional)
+        If True, a root move that the iteration interrupted by the timer has
+        proven better than the previous iteration's best move is played
+        instead (see `partial_move()`). Off by default.
     """
 
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 in_place=False, tt_size=0, tt_replacement="depth",
+                 tt_persist=False, move_ordering=None, search_mode="alphabeta",
+                 aspiration_window=0., stats=False, stats_log=None,
+                 eval_cache=0, endgame_solver=None, opening_book=None,
+                 time_manager=None, partial_results=False):
+        super().__init__(search_depth=search_depth, score_fn=score_fn,
+                         timeout=timeout, in_place=in_place, stats=stats,
+                         stats_log=stats_log, eval_cache=eval_cache)
+        self.tt = TranspositionTable(tt_size, tt_replacement) if tt_size else None
+        self.tt_persist = tt_persist
+        self.move_ordering = move_ordering
+        self.endgame = endgame_solver
+        if isinstance(opening_book, str):
+            opening_book = OpeningBook.load(opening_book)
+        self.opening_book = opening_book
+        self.time_manager = time_manager
+        self.partial_results = partial_results
+        self.principal_variation = ()
+        if search_mode not in ("alphabeta", "pvs"):
+            raise ValueError("search_mode must be 'alphabeta' or 'pvs', not {!r}".format(search_mode))
+        self.pvs = search_mode == "pvs"
+        self.aspiration_window = aspiration_window
+
+    def _prepare_tt(self, new_game):
+        """
+        Description: Ready the transposition table for a new call to get_move. Entries are only reused on later turns of the same game, from the same seat, when tt_persist is set; scores are stored from this player's point of view, so entries from another game or seat are never valid.
+
+        :param new_game: (bool) True if this call starts a new game (see `_begin_turn`).
+        """
+        if self.tt is None:
+            return
+        if new_game or not self.tt_persist:
+            self.tt.clear()
+        else:
+            self.tt.new_search()
+
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -338,14 +1147,84 @@ class AlphaBetaPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        self.principal_variation = ()
+        if self.stats is not None:
+            self.stats.begin()
+        self._prepare_tt(self._begin_turn(game))
+        if self.opening_book is not None:
+            book_move = self.opening_book.lookup(game)
+            if book_move is not None:
+                if self.stats is not None:
+                    self.stats.end(self)
+                return book_move
+        self.nodes = 0
+        if self.time_manager is not None:
+            self.time_manager.start(game, time_left, self.TIMER_THRESHOLD)
+        if self.move_ordering is not None:
+            game = game.copy() # The ordering stage sorts every move list, so skip the board's shuffle.
+            game.set_move_order(shuffle_moves=False)
+            self.move_ordering.new_search(game)
         best_move = (-1, -1) # Initialize with losing move.
         try: # The try/except block will automatically catch the exception raised when the timer is about to expire.
             current_depth = 1
+            best_score = None
             while True:
-                best_move = self.alphabeta(game, current_depth)
+                best_move, best_score = self.aspiration_search(game, current_depth, best_score)
+                if self.stats is not None:
+                    self.stats.depth = current_depth
+                if self.endgame is not None and abs(best_score) == float("inf"):
+                    break  # A proven win or loss; deeper iterations cannot change it.
+                if self.time_manager is not None and not self.time_manager.next_iteration(current_depth, self.nodes):
+                    break  # The next iteration is not expected to finish in time.
                 current_depth += 1 # Run alphabeta with increasing depth.
         except SearchTimeout:
-            return best_move  # Return the best move from the last completed search iteration.
+            if self.partial_results:
+                best_move = self.partial_move(best_move)
+        self._root_depth = None
+        if self.stats is not None:
+            self.stats.end(self)
+        return best_move  # Return the best move from the last completed search iteration.
+
+    def partial_move(self, previous_move):
+        """
+        Description: Choose between the best move of the last completed iteration and the root moves that the interrupted iteration searched to completion. A deeper result replaces the previous move only once the previous move has itself been searched at the new depth (which costs nothing when move ordering searches it first) and another move scored strictly better inside the root window; a score at or below the window's alpha is only an upper bound, so it cannot prove anything.
+
+        :param previous_move: (tuple) Best move of the last completed iteration, or (-1, -1) if none completed.
+        :return: (tuple) The move to play.
+        """
+        results = self._root_results
+        if not results:
+            return previous_move
+        score, move = max(results, key=lambda result: result[0])
+        if previous_move == (-1, -1):
+            return move  # Any fully searched move beats giving up the turn.
+        if move != previous_move and score > self._root_alpha and \
+                any(searched == previous_move for _, searched in results):
+            if self.stats is not None:
+                self.stats.partial_moves += 1
+            return move
+        return previous_move
+
+    def aspiration_search(self, game, depth, previous_score=None):
+        """
+        Description: Search the root to the given depth inside an aspiration window centered on the previous iteration's score, re-searching with the window opened on the failing side whenever the result falls outside it. Without a previous (finite) score, or with aspiration windows disabled, this is a single full-window search.
+
+        :param game: (isolation.Board) Isolation game object.
+        :param depth: (int) Number of levels to traverse.
+        :param previous_score: (float) Root score from the previous iteration, or None.
+        :return: (tuple) Best root move and its score.
+        """
+        alpha, beta = float("-inf"), float("inf")
+        if self.aspiration_window > 0 and previous_score is not None and abs(previous_score) != float("inf"):
+            alpha, beta = previous_score - self.aspiration_window, previous_score + self.aspiration_window
+        while True:
+            best_move, best_score = self.alphabeta_root(game, depth, alpha, beta)
+            if best_score <= alpha and alpha != float("-inf"):  # Fail low: every root move may be worse than reported.
+                alpha = float("-inf")
+            elif best_score >= beta and beta != float("inf"):  # Fail high: the best root move may be better than reported.
+                beta = float("inf")
+            else:
+                return best_move, best_score
 
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
@@ -392,58 +1271,383 @@ class AlphaBetaPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        return self.alphabeta_root(game, depth, alpha, beta)[0]
+
+    def alphabeta_root(self, game, depth, alpha=float("-inf"), beta=float("inf")):
+        """
+        Description: Search every root move to the given depth and return the best one together with its score. The score is fail-soft: a score at or below alpha is an upper bound, and a score at or above beta (which stops the root search early) is a lower bound.
+
+        :param game: (isolation.Board) Isolation game object.
+        :param depth: (int) Number of levels to traverse.
+        :param alpha: (float) Lower bound of the root search window.
+        :param beta: (float) Upper bound of the root search window.
+        :return: (tuple) Best root move ((-1, -1) if there are no legal moves) and its score.
+        """
+        if self.in_place:
+            game = game.copy() # Search on a private board so the caller's state is never left mid-tree.
+
+        if self.move_ordering is not None:  # Search the previous iteration's best root move first.
+            self.move_ordering.new_iteration(game)
+
+        self._root_depth, self._root_alpha, self._root_results = depth, alpha, []
+        best_score, principal_variation = self.negamax(game, depth, alpha, beta)
+        self.principal_variation = principal_variation
+        if not principal_variation:
+            return (-1, -1), best_score # No valid moves (lose).
+        return principal_variation[0], best_score
+
+
+class MCTSNode:
+    """A node of the Monte Carlo search tree: the position reached by `move`,
+    the player who made it, and the results of the playouts through it.
+    Nodes do not point back to their parents, so a discarded subtree is
+    freed at once instead of waiting for the cycle collector.
+    """
+    __slots__ = ("move", "player", "children", "untried", "visits", "wins", "key")
+
+    def __init__(self, move, player, untried, key):
+        self.move = move
+        self.player = player
+        self.children = {}
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0
+        self.key = key
+
+
+class MCTSPlayer(SearchMixin, IsolationPlayer):
+    """Game-playing agent that chooses a move using Monte Carlo tree search
+    with the UCT selection rule, playing out games until the time limit and
+    returning the most visited root move.
 
-        legal_moves = game.get_legal_moves()
+    Playouts walk a single private board with `Board.make_move()` and
+    `Board.undo_move()`, so no board is copied after the start of a turn.
 
-        if not legal_moves:
-            return (-1, -1) # No valid moves (lose).
+    Parameters
+    ----------
+    score_fn : callable (optional)
+        If given, rollouts play the move that maximizes this heuristic for
+        the player moving (e.g., `sample_players.improved_score`) instead of
+        a random move.
+
+    timeout : float (optional)
+        Time remaining (in milliseconds) when search is stopped.
+
+    exploration : float (optional)
+        The UCT exploration constant.
+
+    reuse_tree : bool (optional)
+        If True, start each turn from the subtree of the previous search
+        that matches the opponent's reply, keeping its statistics.
+    """
 
-        legal_move_to_score_map = {} # Get the score of each legal move {legal_move1: score1, legal_move2: score2, etc...}
-        for legal_move in legal_moves:
-            legal_move_to_score_map[legal_move] = AlphaBetaPlayer.alphabeta_recursion_helper(self, game.forecast_move(legal_move), depth - 1, False, alpha, beta) # We start with the root, which is a maximizer (so we pass False).
-            alpha = max(alpha, legal_move_to_score_map[legal_move])
-        best_move = max(legal_move_to_score_map, key=lambda k: legal_move_to_score_map[k])
+    def __init__(self, score_fn=None, timeout=10., exploration=sqrt(2),
+                 reuse_tree=True, stats=False, stats_log=None):
+        super().__init__(score_fn=score_fn, timeout=timeout, stats=stats,
+                         stats_log=stats_log)
+        self.exploration = exploration
+        self.reuse_tree = reuse_tree
+        self._root = None
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        self.time_left = time_left
+        if self.stats is not None:
+            self.stats.begin()
+        new_game = self._begin_turn(game)
+
+        root = None if new_game or not self.reuse_tree else self._reuse_subtree(game)
+        if root is None:
+            root = MCTSNode(None, game.inactive_player, game.get_legal_moves(), game.hash())
+
+        if root.untried or root.children:  # Without legal moves there is nothing to search; return (-1, -1) at once.
+            board = game.copy()
+            board.set_move_order(shuffle_moves=False)
+            while self.time_left() > self.TIMER_THRESHOLD:
+                self.playout(root, board)
+
+        best_move = (-1, -1)
+        self._root = None
+        if root.children:
+            self._root = max(root.children.values(), key=lambda child: child.visits)
+            best_move = self._root.move
+        elif root.untried:
+            best_move = root.untried[0]
+        if self.stats is not None:
+            self.stats.end(self)
         return best_move
 
-    def alphabeta_recursion_helper(self, game, depth, is_maximizing_player, alpha, beta):
-        '''
-        Description: This helper function implements the recursive portion of the alpha beta algorithm from the text. When called from the alphabeta function, alphabeta_recursion_helper will return the score associated with the best_move to take from the root.
+    def _reuse_subtree(self, game):
+        """
+        Description: Find the node for the current position below the node of the move this player chose last turn.
 
-        :param self: (AlphaBetaPlayer) AlphaBetaPlayer object.
-        :param game: (isolation.Board) Isolation game object.
-        :param depth: (int) Number of levels to traverse.
-        :param is_maximizing_player: (boolean) True if maximizer node; False if minimizer node.
-        :param alpha: (float) Maximum score on path to the maximizer node.
-        :param beta: (float) Minimum score on path to the minimizer node.
-        :return: Score value (float): Score associated with the game state.
-        '''
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        :param game: (isolation.Board) Isolation game object at the start of this turn.
+        :return: (MCTSNode) The matching subtree, or None if the opponent's reply was never expanded.
+        """
+        if self._root is None:
+            return None
+        node = self._root.children.get(game.get_player_location(game.inactive_player))
+        if node is None or node.key != game.hash():
+            return None
+        return node
+
+    def playout(self, root, board):
+        """
+        Description: Run one iteration of MCTS from the root: select a path with UCT, expand one new node, play the game out and back up the result. The board must be in the root position, and is returned to it.
 
-        if depth == 0:  # Depth limit reached; return the score.
-            return self.score(game, self)
+        :param root: (MCTSNode) Root of the search tree.
+        :param board: (isolation.Board) Private board in the root position.
+        """
+        if self.stats is not None:
+            self.stats.nodes += 1
+        node = root
+        path = [root]
+        while not node.untried and node.children:  # Selection
+            node = self.select(node)
+            board.make_move(node.move)
+            path.append(node)
+
+        if node.untried:  # Expansion
+            move = node.untried.pop()
+            board.make_move(move)
+            child = MCTSNode(move, board.inactive_player, board.get_legal_moves(), board.hash())
+            node.children[move] = child
+            path.append(child)
+
+        plies = len(path) - 1
+
+        while True:  # Rollout
+            moves = board.get_legal_moves()
+            if not moves:
+                break
+            board.make_move(self.rollout_move(board, moves))
+            plies += 1
+        loser = board.active_player
+        for _ in range(plies):
+            board.undo_move()
+
+        for node in path:  # Backpropagation
+            node.visits += 1
+            if node.player != loser:
+                node.wins += 1
+
+    def select(self, node):
+        """Return the child of a fully expanded node with the highest UCT value."""
+        exploration = self.exploration * sqrt(log(node.visits))
+        return max(node.children.values(),
+                   key=lambda child: child.wins / child.visits + exploration / sqrt(child.visits))
+
+    def rollout_move(self, board, moves):
+        """Choose a rollout move: random, or the best one by the score function."""
+        if self.score is None:
+            return random.choice(moves)
+        player = board.active_player
+        best_move, best_score = None, None
+        for move in moves:
+            board.make_move(move)
+            score = self.score(board, player)
+            board.undo_move()
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+        return best_move
 
-        legal_moves = game.get_legal_moves()
 
-        if not legal_moves:  # Leaf or dead end. Return Score.
-            return self.score(game, self)
-
-        if is_maximizing_player: # Recursive alpha beta.
-            best_child_node_move_score = float("-inf")
-            for child_node_move in legal_moves:  # for each possible child node
-                best_child_node_move_score = max(best_child_node_move_score, AlphaBetaPlayer.alphabeta_recursion_helper(self, game.forecast_move(child_node_move), depth - 1, False, alpha, beta))
-                if best_child_node_move_score >= beta:
-                    return best_child_node_move_score # prune (terminate early)
-                alpha = max(alpha, best_child_node_move_score)
-            return best_child_node_move_score # return best path to maximizer
-
-        else:  # minimizer
-            best_child_node_move_score = float("inf")
-            for child_node_move in legal_moves:
-                best_child_node_move_score = min(best_child_node_move_score, AlphaBetaPlayer.alphabeta_recursion_helper(self, game.forecast_move(child_node_move), depth - 1, True, alpha, beta))
-                if best_child_node_move_score <= alpha:
-                    return best_child_node_move_score # prune (terminate early)
-                beta = min(beta, best_child_node_move_score)
-            return best_child_node_move_score # return best path to minimizer
+def _ponder_position(game):
+    """Describe the position of a turn with public Board state only: the
+    board size, the move count, the locations of the player to move and of
+    its opponent, and the other blocked cells."""
+    own = game.get_player_location(game.active_player)
+    opp = game.get_player_location(game.inactive_player)
+    blank = set(game.get_blank_spaces())
+    cells = [(r, c) for c in range(game.width) for r in range(game.height)
+             if (r, c) not in blank and (r, c) != own and (r, c) != opp]
+    return game.width, game.height, game.move_count, own, opp, cells
+
+
+def _rebuild_position(player, position):
+    """Set up a position described by _ponder_position() on a new board with
+    `player` to move. Only the set of blocked cells, the locations and the
+    move count make up a state, so the other blocked cells are handed out
+    to the two players in any order before their current locations."""
+    from isolation import Board
+    width, height, move_count, own, opp, cells = position
+    if move_count % 2 == 0:
+        game, first, second = Board(player, PONDER_OPPONENT, width, height), own, opp
+    else:
+        game, first, second = Board(PONDER_OPPONENT, player, width, height), opp, own
+    first_moves = cells[:(move_count + 1) // 2 - 1] + [first]
+    second_moves = cells[(move_count + 1) // 2 - 1:] + [second]
+    for ply in range(move_count):
+        game.apply_move((first_moves if ply % 2 == 0 else second_moves)[ply // 2])
+    return game
+
+
+def _predict_reply(player, game, move):
+    """Return the opponent's expected reply to `move`, and the position after
+    it, or (None, None) if either player would have no move to make."""
+    board = game.forecast_move(move)
+    pv = getattr(player, "principal_variation", ())
+    if len(pv) > 1 and pv[0] == move:
+        reply = pv[1]
+    else:
+        replies = board.get_legal_moves()
+        if not replies:
+            return None, None
+        reply = min(replies, key=lambda reply: player.score(board.forecast_move(reply), player))
+    board.apply_move(reply)
+    if not board.get_legal_moves():
+        return None, None
+    return reply, board
+
+
+def _ponder_worker(conn, player, deadline, ponder_limit):
+    """Serve the turns of a PonderingPlayer, pondering in between.
+
+    Each request carries the position of a turn and its deadline. A request
+    for the position being pondered is answered with the pondered move, once
+    that search has run until the deadline the requesting process set for
+    it; any other position is searched from scratch.
+    """
+    from timeit import default_timer
+    time_left = lambda: 1000 * (deadline.value - default_timer())
+    pondered = None
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        position, move_deadline = request
+        game = _rebuild_position(player, position)
+        if pondered is not None and pondered[0].hash() == game.hash():
+            move = pondered[1]
+        else:
+            if pondered is not None and hasattr(player, "_last_turn"):
+                player._last_turn = pondered[2]  # Forget the abandoned turn, so this one is not taken for a new game.
+            deadline.value = move_deadline
+            move = player.get_move(game, time_left)
+        reply, board = (None, None) if move == (-1, -1) else _predict_reply(player, game, move)
+        deadline.value = default_timer() + ponder_limit / 1000
+        conn.send((move, reply, None if board is None else board.hash()))
+        pondered = None
+        if board is not None:
+            turn = getattr(player, "_last_turn", None)
+            pondered = (board, player.get_move(board, time_left), turn)
+
+
+class PonderingPlayer:
+    """Run a search player in a worker process that keeps searching on the
+    opponent's time.
+
+    After each move, the worker predicts the opponent's reply (the second
+    move of the player's `principal_variation`, or else the reply that
+    leaves the lowest score) and searches the position after it until the
+    next turn, with the player's transposition table and move ordering
+    carried over. If the opponent plays the predicted reply (a ponder hit)
+    that search goes on until the new turn's deadline, so the answer comes
+    from a deeper search; any other reply abandons it, and the turn is
+    searched from scratch. Pondering only gains time when a core is free
+    while the opponent thinks; on a single core it takes its time from the
+    opponent.
+
+    Parameters
+    ----------
+    player : object
+        The searching player (e.g., an `AlphaBetaPlayer`, ideally with
+        `tt_persist=True`). Its `get_move()` must return before the timer
+        runs out, since the timer is how pondering is stopped.
+
+    ponder_limit : float (optional)
+        Longest time in milliseconds to ponder a move, in case the game ends
+        without another turn.
+
+    reserve : float (optional)
+        Milliseconds of each turn set aside for passing the position to the
+        worker and the move back.
+    """
+
+    def __init__(self, player, ponder_limit=10000., reserve=5.):
+        self.player = player
+        self.ponder_limit = ponder_limit
+        self.reserve = reserve
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self._worker = None
+        self._pondered = None
+
+    def _start_worker(self):
+        # imported here so players that never ponder skip the multiprocessing import
+        from multiprocessing import Pipe, Process, Value
+        from timeit import default_timer
+        self._timer = default_timer
+        self._deadline = Value("d", float("-inf"), lock=False)
+        self._conn, worker_conn = Pipe()
+        self._worker = Process(target=_ponder_worker, daemon=True,
+                               args=(worker_conn, self.player, self._deadline, self.ponder_limit))
+        self._worker.start()
+
+    def get_move(self, game, time_left):
+        """Ask the worker for the move of this turn (see the class docstring)."""
+        if self._worker is None:
+            self._start_worker()
+        deadline = self._timer() + (time_left() - self.reserve) / 1000
+        if self._pondered is not None:
+            hit = game.hash() == self._pondered[1]
+            self._deadline.value = deadline if hit else float("-inf")
+            if hit:
+                self.ponder_hits += 1
+            else:
+                self.ponder_misses += 1
+        self._conn.send((_ponder_position(game), deadline))
+        move, reply, key = self._conn.recv()
+        self._pondered = None if key is None else (reply, key)
+        return move
+
+    def notify_move(self, move):
+        """Called by `Board.play()` with each move of the opponent: a reply
+        other than the predicted one stops pondering at once."""
+        if self._pondered is not None and move != self._pondered[0]:
+            self._deadline.value = float("-inf")
+
+    def close(self):
+        """Stop the worker process."""
+        if self._worker is not None:
+            self._deadline.value = float("-inf")
+            self._conn.send(None)
+            self._worker.join()
+            self._worker = None
+            self._pondered = None
+
+    def __del__(self):
+        # Tournament workers unpickle a fresh copy of each player per game,
+        # so stop the copy's worker process along with it.
+        try:
+            self.close()
+        except (OSError, ValueError):
+            pass
+
+    def __getstate__(self):
+        """Pickle the player without its worker, which is started again on
+        the first turn after unpickling."""
+        state = self.__dict__.copy()
+        for name in ("_worker", "_conn", "_deadline", "_timer"):
+            state.pop(name, None)
+        state["_worker"], state["_pondered"] = None, None
+        return state
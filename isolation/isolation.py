@@ -9,10 +9,12 @@ be available to project reviewers.
 """
 import random
 import timeit
-from copy import copy
 
 TIME_LIMIT_MILLIS = 150
 
+KNIGHT_DIRECTIONS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                     (1, -2), (1, 2), (2, -1), (2, 1))
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -33,11 +35,32 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle_moves : bool (optional)
+        If False, legal moves are generated in a fixed order (the knight
+        directions in order) instead of being shuffled.
+
+    seed : hashable (optional)
+        If set, moves are shuffled by a private generator seeded with this
+        value, so identical games produce identical move orders.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    # Knight-move tables shared by every board with the same geometry, keyed
+    # on (width, height); see Board._knight_tables_for()
+    _knight_tables = {}
+
+    # Zobrist keys shared by every board with the same geometry, keyed on
+    # (width, height); see Board._zobrist_keys_for()
+    _zobrist_tables = {}
+
+    # Cell permutations of the board symmetries, keyed on (width, height);
+    # see Board._symmetries_for()
+    _symmetry_tables = {}
+
+    def __init__(self, player_1, player_2, width=7, height=7,
+                 shuffle_moves=True, seed=None):
         self.width = width
         self.height = height
         self.move_count = 0
@@ -46,14 +69,150 @@ class Board(object):
         self._active_player = player_1
         self._inactive_player = player_2
 
-        # The last 3 entries of the board state includes initiative (0 for
-        # player 1, 1 for player 2) player 2 last move, and player 1 last move
-        self._board_state = [Board.BLANK] * (width * height + 3)
-        self._board_state[-1] = Board.NOT_MOVED
-        self._board_state[-2] = Board.NOT_MOVED
+        # The board state is a bitboard: bit `idx` of `_blocked` is set once
+        # a player has occupied the cell at index `idx` (row + col * height),
+        # and each player location is stored as a cell index (or NOT_MOVED).
+        # Initiative is implied by the active player, so copying a state
+        # costs one int copy and two index copies.
+        self._blocked = 0
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._move_stack = []
+        # Unshuffled legal moves of each player in the current state, built on
+        # first use and discarded whenever the state changes
+        self._legal_moves = [None, None]
+        self._moves, self._move_masks, self._cells = \
+            Board._knight_tables_for(width, height)
+        self._zobrist = Board._zobrist_keys_for(width, height)
+        self._hash = 0
+        self.set_move_order(shuffle_moves, seed)
+
+    def set_move_order(self, shuffle_moves=True, seed=None):
+        """Choose how get_legal_moves() orders the moves of this board and of
+        every copy made from it afterwards.
+
+        Parameters
+        ----------
+        shuffle_moves : bool (optional)
+            If False, generate moves in a fixed order and skip the shuffle
+            (e.g., for searchers that order moves themselves).
+
+        seed : hashable (optional)
+            If set, shuffle with a private generator seeded with this value
+            rather than the global `random` module.
+        """
+        if not shuffle_moves:
+            self._shuffle = None
+        elif seed is not None:
+            self._shuffle = random.Random(seed).shuffle
+        else:
+            self._shuffle = random.shuffle
+
+    @classmethod
+    def _knight_tables_for(cls, width, height):
+        """Return the knight-move tables for a board geometry, building them
+        the first time the geometry is seen.
+
+        Returns
+        -------
+        (tuple, tuple, tuple)
+            For each cell index: the indices of its in-bounds knight
+            destinations, the same destinations as a bitmask, and the
+            (row, column) coordinate pair of the cell itself.
+        """
+        tables = cls._knight_tables.get((width, height))
+        if tables is None:
+            cells = tuple((idx % height, idx // height)
+                          for idx in range(width * height))
+            moves = tuple(tuple(r + dr + (c + dc) * height
+                                for dr, dc in KNIGHT_DIRECTIONS
+                                if 0 <= r + dr < height and 0 <= c + dc < width)
+                          for r, c in cells)
+            masks = tuple(sum(1 << dest for dest in dests) for dests in moves)
+            tables = cls._knight_tables[(width, height)] = (moves, masks, cells)
+        return tables
+
+    @classmethod
+    def _zobrist_keys_for(cls, width, height):
+        """Return the Zobrist keys for a board geometry, building them the
+        first time the geometry is seen. The keys come from a generator
+        seeded by the geometry, so hashes are reproducible across processes.
+
+        Returns
+        -------
+        (tuple, tuple, tuple, int)
+            Random 64-bit keys for each cell index being blocked, holding
+            player 1 and holding player 2, and the key for player 2 holding
+            the initiative.
+        """
+        keys = cls._zobrist_tables.get((width, height))
+        if keys is None:
+            rng = random.Random("zobrist-{}x{}".format(width, height))
+            size = width * height
+            keys = cls._zobrist_tables[(width, height)] = (
+                tuple(rng.getrandbits(64) for _ in range(size)),
+                tuple(rng.getrandbits(64) for _ in range(size)),
+                tuple(rng.getrandbits(64) for _ in range(size)),
+                rng.getrandbits(64))
+        return keys
+
+    @classmethod
+    def _symmetries_for(cls, width, height):
+        """Return the cell index permutations of the symmetries of a board
+        geometry: the four reflections of a rectangle, and also the four
+        transposed ones if the board is square. The identity comes first.
+        """
+        perms = cls._symmetry_tables.get((width, height))
+        if perms is None:
+            maps = [lambda r, c: (r, c), lambda r, c: (height - 1 - r, c),
+                    lambda r, c: (r, width - 1 - c),
+                    lambda r, c: (height - 1 - r, width - 1 - c)]
+            if width == height:
+                maps += [lambda r, c, f=f: f(c, r) for f in maps]
+            cells = [(idx % height, idx // height) for idx in range(width * height)]
+            perms = cls._symmetry_tables[(width, height)] = tuple(
+                tuple(r + c * height for r, c in (f(*cell) for cell in cells))
+                for f in maps)
+        return perms
+
+    def symmetries(self):
+        """Return the cell index permutations of the board symmetries (see
+        `Board._symmetries_for()`); cell `idx` maps to `perm[idx]`.
+        """
+        return Board._symmetries_for(self.width, self.height)
+
+    def symmetric_hashes(self):
+        """Return the `hash()` of the image of the current state under each
+        board symmetry, in the order of `symmetries()`. Positions
+        that are reflections (or, on square boards, rotations) of each other
+        share the smallest of these values, which makes it a canonical key.
+        """
+        blocked_keys, p1_keys, p2_keys, p2_to_move_key = self._zobrist
+        cells = []
+        blocked = self._blocked
+        while blocked:
+            low = blocked & -blocked
+            cells.append(low.bit_length() - 1)
+            blocked ^= low
+        hashes = []
+        for perm in self.symmetries():
+            key = p2_to_move_key if self.move_count % 2 else 0
+            for idx in cells:
+                key ^= blocked_keys[perm[idx]]
+            if self._p1_loc is not None:
+                key ^= p1_keys[perm[self._p1_loc]]
+            if self._p2_loc is not None:
+                key ^= p2_keys[perm[self._p2_loc]]
+            hashes.append(key)
+        return hashes
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return the Zobrist hash of the current state: the blocked cells,
+        both player locations and which player holds the initiative. The hash
+        is updated incrementally by each move, so it is cheap enough to key
+        transposition tables and caches during search.
+        """
+        return self._hash
 
     @property
     def active_player(self):
@@ -92,13 +251,48 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        new_board = Board.__new__(Board)
+        new_board.width = self.width
+        new_board.height = self.height
         new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
+        new_board._blocked = self._blocked
+        new_board._p1_loc = self._p1_loc
+        new_board._p2_loc = self._p2_loc
+        new_board._hash = self._hash
+        new_board._zobrist = self._zobrist
+        new_board._shuffle = self._shuffle
+        new_board._move_stack = []
+        new_board._legal_moves = list(self._legal_moves)
+        new_board._moves = self._moves
+        new_board._move_masks = self._move_masks
+        new_board._cells = self._cells
         return new_board
 
+    def __getstate__(self):
+        """Pickle the board without its per-geometry tables, which are
+        rebuilt (or fetched from the class cache) when it is unpickled, so
+        boards are cheap to send to worker processes. A board shuffling with
+        the global `random` module keeps doing so in the receiving process.
+        """
+        state = self.__dict__.copy()
+        for name in ("_moves", "_move_masks", "_cells", "_zobrist"):
+            del state[name]
+        if self._shuffle == random.shuffle:
+            state["_shuffle"] = "global"
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._moves, self._move_masks, self._cells = \
+            Board._knight_tables_for(self.width, self.height)
+        self._zobrist = Board._zobrist_keys_for(self.width, self.height)
+        if self._shuffle == "global":
+            self._shuffle = random.shuffle
+
     def forecast_move(self, move):
         """Return a deep copy of the current game with an input move applied to
         advance the game one ply.
@@ -134,13 +328,14 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
-                self._board_state[idx] == Board.BLANK)
+                not (self._blocked >> idx) & 1)
 
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
+        blocked = self._blocked
         return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+                if not (blocked >> (i + j * self.height)) & 1]
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -156,20 +351,19 @@ class Board(object):
             The coordinate pair (row, column) of the input player, or None
             if the player has not moved.
         """
+        idx = self._player_index(player)
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._cells[idx]
+
+    def _player_index(self, player):
+        """Return the cell index of the specified player, or NOT_MOVED."""
         if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-1]
+            return self._p1_loc
         elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-2]
-        else:
-            raise RuntimeError(
-                "Invalid player in get_player_location: {}".format(player))
-        w = idx // self.height
-        h = idx % self.height
-        return (h, w)
+            return self._p2_loc
+        raise RuntimeError(
+            "Invalid player in get_player_location: {}".format(player))
 
     def get_legal_moves(self, player=None):
         """Return the list of all legal moves for the specified player.
@@ -188,7 +382,169 @@ class Board(object):
         """
         if player is None:
             player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+        if player == self._player_1:
+            seat, idx = 0, self._p1_loc
+        elif player == self._player_2:
+            seat, idx = 1, self._p2_loc
+        else:
+            raise RuntimeError(
+                "Invalid player in get_legal_moves: {}".format(player))
+        moves = self._legal_moves[seat]
+        if moves is None:
+            moves = self._legal_moves[seat] = self.__get_moves(idx)
+        moves = list(moves)
+        if self._shuffle is not None and idx != Board.NOT_MOVED:
+            # as in the original Board, the open cells a player who has not
+            # moved yet may choose from are returned in order
+            self._shuffle(moves)
+        return moves
+
+    def count_legal_moves(self, player=None):
+        """Return the number of legal moves for the specified player without
+        building the move list.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            count the legal moves for the active player on the board.
+
+        Returns
+        -------
+        int
+            The number of legal moves available to the player.
+        """
+        if player is None:
+            player = self.active_player
+        idx = self._player_index(player)
+        if idx == Board.NOT_MOVED:
+            return self.width * self.height - bin(self._blocked).count("1")
+        return bin(self._move_masks[idx] & ~self._blocked).count("1")
+
+    def reachable_mask(self, player):
+        """Return the open cells the specified player can eventually reach by
+        a sequence of knight moves, as a bitmask of cell indices (bit
+        `row + col * height`, as in the board's own state).
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        int
+            The flood fill of the open cells from the player's location; all
+            open cells if the player has not moved yet.
+        """
+        idx = self._player_index(player)
+        open_cells = ~self._blocked & ((1 << self.width * self.height) - 1)
+        if idx == Board.NOT_MOVED:
+            return open_cells
+        masks = self._move_masks
+        reached = 0
+        frontier = masks[idx] & open_cells
+        while frontier:
+            reached |= frontier
+            grown = 0
+            while frontier:
+                bit = frontier & -frontier
+                frontier ^= bit
+                grown |= masks[bit.bit_length() - 1]
+            frontier = grown & open_cells & ~reached
+        return reached
+
+    def is_partitioned(self):
+        """Return True if both players are on the board and no open cell is
+        reachable by both of them, so that neither player's moves can ever
+        affect the other's for the rest of the game.
+        """
+        if self._p1_loc == Board.NOT_MOVED or self._p2_loc == Board.NOT_MOVED:
+            return False
+        return not (self.reachable_mask(self._player_1) &
+                    self.reachable_mask(self._player_2))
+
+    def longest_path(self, player, memo=None, max_nodes=None, target=None):
+        """Find the longest sequence of moves the specified player could make
+        if the opponent never moved again, by exhaustive search over the
+        player's reachable region. Once the board is partitioned, the player
+        who can make more moves wins.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        memo : dict (optional)
+            Results of earlier calls for boards of the same size, keyed on a
+            location and a set of open cells; pass the same dict to later
+            calls to reuse them.
+
+        max_nodes : int (optional)
+            Give up after expanding this many positions not found in `memo`.
+
+        target : int (optional)
+            Stop as soon as a path of at least this many moves is found, in
+            which case the length returned may be less than the longest.
+
+        Returns
+        -------
+        (int, (int, int)) or None
+            The length of the longest path and its first move (None for a
+            length of 0), or None if the player has not moved yet or the
+            search gave up.
+        """
+        idx = self._player_index(player)
+        if idx == Board.NOT_MOVED:
+            return None
+        masks = self._move_masks
+        if memo is None:
+            memo = {}
+        budget = [-1 if max_nodes is None else max_nodes]
+
+        cells = self.width * self.height
+
+        def longest(idx, open_cells, need):
+            key = open_cells * cells + idx  # An int key keeps a large memo out of the garbage collector's way.
+            length = memo.get(key)
+            if length is not None:
+                return length
+            if budget[0] == 0:
+                return None
+            budget[0] -= 1
+            best = 0
+            bound = bin(open_cells).count("1")
+            dests = masks[idx] & open_cells
+            while dests:
+                bit = dests & -dests
+                dests ^= bit
+                length = longest(bit.bit_length() - 1, open_cells ^ bit, need - 1)
+                if length is None:
+                    return None
+                if length >= best:
+                    best = length + 1
+                    if best == bound:
+                        break
+                    if best >= need:
+                        return best  # Long enough, but maybe not the longest; not memoized.
+            memo[key] = best
+            return best
+
+        need = float("inf") if target is None else target
+        region = self.reachable_mask(player)
+        best, best_move = 0, None
+        dests = masks[idx] & region
+        while dests:
+            bit = dests & -dests
+            dests ^= bit
+            length = longest(bit.bit_length() - 1, region ^ bit, need - 1)
+            if length is None:
+                return None
+            if length >= best:
+                best, best_move = length + 1, self._cells[bit.bit_length() - 1]
+                if best >= need:
+                    break
+        return best, best_move
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -200,20 +556,73 @@ class Board(object):
             the active player on the board.
         """
         idx = move[0] + move[1] * self.height
-        last_move_idx = int(self.active_player == self._player_2) + 1
-        self._board_state[-last_move_idx] = idx
-        self._board_state[idx] = 1
-        self._board_state[-3] ^= 1
+        blocked_keys, p1_keys, p2_keys, p2_to_move_key = self._zobrist
+        if self._active_player == self._player_1:
+            if self._p1_loc != Board.NOT_MOVED:
+                self._hash ^= p1_keys[self._p1_loc]
+            self._p1_loc = idx
+            self._hash ^= p1_keys[idx] ^ p2_to_move_key
+        else:
+            if self._p2_loc != Board.NOT_MOVED:
+                self._hash ^= p2_keys[self._p2_loc]
+            self._p2_loc = idx
+            self._hash ^= p2_keys[idx] ^ p2_to_move_key
+        if not (self._blocked >> idx) & 1:
+            self._hash ^= blocked_keys[idx]
+        self._blocked |= 1 << idx
+        self._legal_moves = [None, None]
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def make_move(self, move):
+        """Apply a move in-place like apply_move(), remembering enough of the
+        previous state that undo_move() can take it back. Search code can use
+        the pair to walk the game tree on a single board instead of building
+        a copy per node with forecast_move().
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        self._move_stack.append((self._blocked, self._p1_loc, self._p2_loc, self._hash))
+        self.apply_move(move)
+
+    def undo_move(self):
+        """Take back the most recent move applied with make_move(). Moves
+        applied with apply_move() (or made before the board was copied) are
+        permanent and cannot be undone.
+        """
+        self._blocked, self._p1_loc, self._p2_loc, self._hash = self._move_stack.pop()
+        self._legal_moves = [None, None]
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+
+    def terminal_status(self):
+        """Return the winner if the game is over, or None if it is not.
+
+        The game is over when the active player has no legal moves, so one
+        count of the active player's moves answers both `is_winner()` and
+        `is_loser()` for either player: the inactive player has won, and the
+        active player has lost.
+
+        Returns
+        -------
+        object or None
+            The winning player, or None if the active player can still move.
+        """
+        if self.count_legal_moves(self._active_player):
+            return None
+        return self._inactive_player
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and self.terminal_status() is not None
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and self.terminal_status() is not None
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,9 +646,10 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        winner = self.terminal_status()
+        if winner is not None:
 
-            if player == self._inactive_player:
+            if player == winner:
                 return float("inf")
 
             if player == self._active_player:
@@ -247,20 +657,19 @@ class Board(object):
 
         return 0.
 
-    def __get_moves(self, loc):
+    def __get_moves(self, idx):
         """Generate the list of possible moves for an L-shaped motion (like a
-        knight in chess).
+        knight in chess) from the cell index `idx`, filtering the precomputed
+        knight destinations against the blocked cells. The list is cached by
+        get_legal_moves(), so it must not be modified.
         """
-        if loc == Board.NOT_MOVED:
+        if idx == Board.NOT_MOVED:
             return self.get_blank_spaces()
 
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
-        return valid_moves
+        blocked = self._blocked
+        cells = self._cells
+        return [cells[dest] for dest in self._moves[idx]
+                if not (blocked >> dest) & 1]
 
     def print_board(self):
         """DEPRECATED - use Board.to_string()"""
@@ -271,8 +680,9 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
+        p1_loc = self._p1_loc
+        p2_loc = self._p2_loc
+        blocked = self._blocked
 
         col_margin = len(str(self.height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
@@ -282,7 +692,7 @@ class Board(object):
             out += prefix.format(i) + ' | '
             for j in range(self.width):
                 idx = i + j * self.height
-                if not self._board_state[idx]:
+                if not (blocked >> idx) & 1:
                     out += ' '
                 elif p1_loc == idx:
                     out += symbols[0]
@@ -297,7 +707,9 @@ class Board(object):
 
     def play(self, time_limit=TIME_LIMIT_MILLIS):
         """Execute a match between the players by alternately soliciting them
-        to select a move and applying it in the game.
+        to select a move and applying it in the game. After each move, the
+        opponent of the player who made it is passed the move if it has a
+        `notify_move(move)` method.
 
         Parameters
         ----------
@@ -340,3 +752,9 @@ class Board(object):
             move_history.append(list(curr_move))
 
             self.apply_move(curr_move)
+
+            # Players may define notify_move(move) to learn each move of
+            # their opponent as soon as it is played (e.g., to stop pondering)
+            notify_move = getattr(self._active_player, "notify_move", None)
+            if notify_move is not None:
+                notify_move(curr_move)
@@ -0,0 +1,123 @@
+"""Build an opening book by searching the first plies of the game offline,
+for players to load with `game_agent.OpeningBook`.
+
+Every position with fewer than `plies` moves played is searched once for
+all of its reflections and rotations, with a much longer time limit than a
+game allows. The book is a JSON object small enough for the competition's
+optional data.json file:
+
+    {"width": 7, "height": 7, "plies": 3,
+     "moves": {"<smallest Board.symmetric_hashes() value in hex>": <cell index>, ...}}
+
+where each move is a cell index (row + col * height) in the frame of the
+symmetry that produced the key.
+
+    python opening_book.py data.json --plies 3 --time-limit 2000 --workers 4
+"""
+import argparse
+import json
+
+from concurrent.futures import ProcessPoolExecutor
+from timeit import default_timer
+
+from isolation import Board
+from tournament import cap_workers, make_agent
+
+# The placeholder opponent of the searching player on book positions
+OPPONENT = "opponent"
+
+
+def positions(plies, width=7, height=7):
+    """Yield the moves leading to one representative of every position,
+    up to symmetry, with fewer than `plies` moves played and a legal move
+    for the player to move, in order of move count."""
+    seen = set()
+    level = [[]]
+    for _ in range(plies):
+        next_level = []
+        for moves in level:
+            game = Board("player 1", "player 2", width, height, shuffle_moves=False)
+            for move in moves:
+                game.apply_move(move)
+            key = min(game.symmetric_hashes())
+            legal_moves = game.get_legal_moves()
+            if key in seen or not legal_moves:
+                continue
+            seen.add(key)
+            yield moves
+            next_level.extend(moves + [move] for move in legal_moves)
+        level = next_level
+
+
+def search(job):
+    """Search one book position and return its key and canonical move, or
+    None if the search did not finish an iteration.
+
+    This is the unit of work sent to worker processes. The position is
+    replayed with the searching player in the seat of the player to move.
+    """
+    moves, player, time_limit, width, height = job
+    seats = (player, OPPONENT) if len(moves) % 2 == 0 else (OPPONENT, player)
+    game = Board(*seats, width=width, height=height)
+    for move in moves:
+        game.apply_move(move)
+    start = default_timer()
+    move = player.get_move(game, lambda: time_limit - 1000 * (default_timer() - start))
+    if move == (-1, -1):
+        return None
+    hashes = game.symmetric_hashes()
+    key = min(hashes)
+    perm = game.symmetries()[hashes.index(key)]
+    return format(key, "x"), perm[move[0] + move[1] * height]
+
+
+def build(player, plies=3, time_limit=2000, width=7, height=7, workers=1):
+    """Search every book position with `player` and return the book as a
+    dict in the format of the module docstring. Positions whose search
+    did not finish an iteration are left out of the book.
+    """
+    threshold = getattr(player, "TIMER_THRESHOLD", 0)
+    if time_limit <= threshold:
+        raise ValueError(("The time limit of {} ms leaves no time to search " +
+                          "after the player's {} ms timeout margin").format(
+                              time_limit, threshold))
+    workers = cap_workers(workers)
+    jobs = [(moves, player, time_limit, width, height)
+            for moves in positions(plies, width, height)]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(search, jobs))
+    else:
+        results = list(map(search, jobs))
+    return {"width": width, "height": height, "plies": plies,
+            "moves": dict(result for result in results if result is not None)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the opening positions " +
+                                     "of Isolation offline and write an opening book.")
+    parser.add_argument("output", nargs="?", default="data.json",
+                        help="book file to write (default data.json)")
+    parser.add_argument("-a", "--agent", default="AB_Improved",
+                        help="the searching agent, named as in tournament.py " +
+                             "(default AB_Improved)")
+    parser.add_argument("--plies", type=int, default=3,
+                        help="cover positions with fewer moves played (default 3)")
+    parser.add_argument("--time-limit", type=int, default=2000,
+                        help="milliseconds of search per position (default 2000)")
+    parser.add_argument("--width", type=int, default=7, help="board width (default 7)")
+    parser.add_argument("--height", type=int, default=7, help="board height (default 7)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="number of positions to search in parallel (at " +
+                             "most the number of physical cores; default 1)")
+    args = parser.parse_args()
+
+    book = build(make_agent(args.agent).player, args.plies, args.time_limit,
+                 args.width, args.height, args.workers)
+    with open(args.output, "w") as book_file:
+        json.dump(book, book_file, separators=(",", ":"))
+    print("{} positions in {}".format(len(book["moves"]), args.output))
+
+
+if __name__ == "__main__":
+    main()
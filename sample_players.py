@@ -31,11 +31,9 @@ def null_score(game, player):
         The heuristic value of the current game state.
     """
 
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    winner = game.terminal_status()
+    if winner is not None:
+        return float("inf") if winner == player else float("-inf")
 
     return 0.
 
@@ -60,13 +58,11 @@ def open_move_score(game, player):
     float
         The heuristic value of the current game state
     """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    winner = game.terminal_status()
+    if winner is not None:
+        return float("inf") if winner == player else float("-inf")
 
-    return float(len(game.get_legal_moves(player)))
+    return float(game.count_legal_moves(player))
 
 
 def improved_score(game, player):
@@ -90,14 +86,12 @@ def improved_score(game, player):
     float
         The heuristic value of the current game state
     """
-    if game.is_loser(player):
-        return float("-inf")
+    winner = game.terminal_status()
+    if winner is not None:
+        return float("inf") if winner == player else float("-inf")
 
-    if game.is_winner(player):
-        return float("inf")
-
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = game.count_legal_moves(player)
+    opp_moves = game.count_legal_moves(game.get_opponent(player))
     return float(own_moves - opp_moves)
 
 
@@ -123,11 +117,9 @@ def center_score(game, player):
     float
         The heuristic value of the current game state
     """
-    if game.is_loser(player):
-        return float("-inf")
-
-    if game.is_winner(player):
-        return float("inf")
+    winner = game.terminal_status()
+    if winner is not None:
+        return float("inf") if winner == player else float("-inf")
 
     w, h = game.width / 2., game.height / 2.
     y, x = game.get_player_location(player)
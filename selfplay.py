@@ -0,0 +1,236 @@
+"""Generate self-play games between any two agents and store them in a
+compact binary file for training and analysis.
+
+A game file starts with a 16 byte header -- the magic bytes b"ISOLGAME", a
+format version, the board width and height, and five reserved bytes --
+followed by fixed-width records of 3 + width * height bytes each:
+
+    winner seat (0 for the first player, 1 for the second),
+    termination code (the index of the reason in TERMINATIONS),
+    number of moves,
+    the moves as uint8 cell indices (row + col * height), padded with 0xFF.
+
+Every cell is occupied at most once, so width * height move slots always
+suffice (a 7x7 game takes 52 bytes). The moves include the two random
+opening moves. `GameReader` memory-maps a file so single games or positions
+can be read without parsing the rest of it.
+"""
+import argparse
+import mmap
+import os
+import random
+import warnings
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from isolation import Board
+from tournament import TIME_LIMIT, cap_workers, make_agent, play_game
+
+MAGIC = b"ISOLGAME"
+VERSION = 1
+HEADER_SIZE = 16
+NO_MOVE = 0xFF
+
+# Reasons returned by Board.play, by termination code. The loser of a game
+# played to the end returns an "illegal move" because it has no legal moves.
+TERMINATIONS = ("illegal move", "forfeit", "timeout")
+
+# The placeholder players of boards replayed by GameReader.positions()
+SEATS = ("player 1", "player 2")
+
+GameRecord = namedtuple("GameRecord", ["winner", "termination", "moves"])
+
+
+def _header(width, height):
+    return MAGIC + bytes([VERSION, width, height]) + bytes(HEADER_SIZE - len(MAGIC) - 3)
+
+
+class GameWriter:
+    """Append game records to a game file, creating it if it does not exist.
+    A record cut short by an interrupted run is dropped when the file is
+    reopened, so the records appended after it stay aligned.
+
+    Parameters
+    ----------
+    path : str
+        The game file; an existing file must be for the same board size.
+
+    width, height : int
+        The board size (at most 254 cells so moves fit in a byte).
+    """
+
+    def __init__(self, path, width=7, height=7):
+        if width * height >= NO_MOVE:
+            raise ValueError("Boards of more than {} cells are not supported".format(NO_MOVE - 1))
+        self.width = width
+        self.height = height
+        self.record_size = 3 + width * height
+        header = _header(width, height)
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as game_file:
+                if game_file.read(HEADER_SIZE) != header:
+                    raise ValueError("{} is not a {}x{} game file".format(path, width, height))
+            self._file = open(path, "ab")
+            size = os.path.getsize(path)
+            torn = (size - HEADER_SIZE) % self.record_size
+            if torn:
+                warnings.warn("Dropping a partial record of {} bytes from the end of {}".format(
+                    torn, path))
+                self._file.truncate(size - torn)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(header)
+
+    def write(self, winner, termination, moves):
+        """Append one game given the winning seat, the reason it ended (one
+        of TERMINATIONS) and its moves as (row, col) pairs."""
+        record = bytearray([NO_MOVE]) * self.record_size
+        record[0] = winner
+        record[1] = TERMINATIONS.index(termination)
+        record[2] = len(moves)
+        record[3:3 + len(moves)] = bytes(r + c * self.height for r, c in moves)
+        self._file.write(record)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameReader:
+    """Read-only, memory-mapped access to the games in a game file.
+
+    Games are decoded on access, so indexing or iterating over part of a
+    large file only touches the pages of the records that are read.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as game_file:
+            header = game_file.read(HEADER_SIZE)
+            if header[:len(MAGIC)] != MAGIC or header[len(MAGIC)] != VERSION:
+                raise ValueError("{} is not a game file".format(path))
+            self.width, self.height = header[len(MAGIC) + 1], header[len(MAGIC) + 2]
+            self.record_size = 3 + self.width * self.height
+            size = os.fstat(game_file.fileno()).st_size
+            self._count = (size - HEADER_SIZE) // self.record_size
+            self._map = mmap.mmap(game_file.fileno(), 0, access=mmap.ACCESS_READ) if self._count else b""
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("game index out of range")
+        start = HEADER_SIZE + index * self.record_size
+        winner, termination, num_moves = self._map[start:start + 3]
+        moves = [divmod(idx, self.height)[::-1]
+                 for idx in self._map[start + 3:start + 3 + num_moves]]
+        return GameRecord(winner, TERMINATIONS[termination], moves)
+
+    def __iter__(self):
+        return (self[index] for index in range(self._count))
+
+    def positions(self, start=0, stop=None):
+        """Iterate over (board, move, winner) for every position of games
+        `start` to `stop`, where `move` is the move played from `board` by
+        its active player and `winner` is the seat that won the game.
+
+        Each game is replayed on a single board whose players are the SEATS
+        placeholders, so copy a board to keep it past the next iteration.
+        """
+        for record in islice(self, start, stop):
+            board = Board(SEATS[0], SEATS[1], self.width, self.height)
+            for move in record.moves:
+                yield board, move, record.winner
+                board.apply_move(move)
+
+    def close(self):
+        if self._count:
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _jobs(players, num_games, time_limit, width, height):
+    """Create the games to play, alternating seats and starting each one
+    from two random opening moves."""
+    for index in range(num_games):
+        game = Board(*(players if index % 2 == 0 else players[::-1]), width=width, height=height)
+        opening = []
+        for _ in range(2):
+            move = random.choice(game.get_legal_moves())
+            opening.append(move)
+            game.apply_move(move)
+        yield opening, (game, time_limit, random.getrandbits(32))
+
+
+def generate(path, players, num_games, workers=1, time_limit=TIME_LIMIT,
+             width=7, height=7, batch_size=256):
+    """Play `num_games` games between two players and append them to the
+    game file at `path`.
+
+    Games are created and written `batch_size` at a time, so memory use
+    does not grow with `num_games`; with more than one worker each batch is
+    played on a process pool. Seats alternate between games, and the seat
+    in each record refers to the player order of that game.
+    """
+    workers = cap_workers(workers)
+    jobs = _jobs(players, num_games, time_limit, width, height)
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        with GameWriter(path, width, height) as writer:
+            for batch in iter(lambda: list(islice(jobs, batch_size)), []):
+                games = [job for _, job in batch]
+                if executor is None:
+                    results = map(play_game, games)
+                else:
+                    results = executor.map(play_game, games, chunksize=max(1, len(games) // (4 * workers)))
+                for (opening, _), (winner, termination, history) in zip(batch, results):
+                    writer.write(winner, termination, opening + history)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play self-play games between " +
+                                     "two agents and append them to a binary game file.")
+    parser.add_argument("output", help="game file to create or append to")
+    parser.add_argument("-p", "--players", nargs=2, default=["AB_Improved", "AB_Improved"],
+                        metavar="AGENT", help="the two agents, named as in " +
+                        "tournament.py (default AB_Improved AB_Improved)")
+    parser.add_argument("-n", "--games", type=int, default=100,
+                        help="number of games to play (default 100)")
+    parser.add_argument("--time-limit", type=int, default=TIME_LIMIT,
+                        help="milliseconds per move (default {})".format(TIME_LIMIT))
+    parser.add_argument("--width", type=int, default=7, help="board width (default 7)")
+    parser.add_argument("--height", type=int, default=7, help="board height (default 7)")
+    parser.add_argument("--seed", type=int, help="seed for openings and move order")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="number of games to play in parallel (at most " +
+                             "the number of physical cores; default 1)")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    players = [make_agent(name).player for name in args.players]
+    generate(args.output, players, args.games, args.workers, args.time_limit,
+             args.width, args.height)
+    with GameReader(args.output) as reader:
+        print("{} games in {}".format(len(reader), args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,21 +11,68 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
+import ast
+import csv
+import hashlib
 import itertools
+import json
+import math
+import os
 import random
 import warnings
 
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import game_agent
+import sample_players
 
 from isolation import Board
-from sample_players import (RandomPlayer, open_move_score,
-                            improved_score, center_score)
-from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
-                        custom_score_2, custom_score_3)
+from sample_players import (RandomPlayer, GreedyPlayer, null_score,
+                            open_move_score, improved_score, center_score)
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, MCTSPlayer,
+                        custom_score, custom_score_2, custom_score_3)
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
 
+# Heuristics by the short names used in agent names like "AB_Improved"
+HEURISTICS = {
+    "Null": null_score,
+    "Open": open_move_score,
+    "Center": center_score,
+    "Improved": improved_score,
+    "Custom": custom_score,
+    "Custom_2": custom_score_2,
+    "Custom_3": custom_score_3,
+}
+
+# Player classes by the prefixes used in agent names like "AB_Improved"
+PLAYER_PREFIXES = {
+    "AB": AlphaBetaPlayer,
+    "MM": MinimaxPlayer,
+    "Greedy": GreedyPlayer,
+    "MCTS": MCTSPlayer,
+}
+
+TEST_AGENTS = ["AB_Improved", "AB_Custom", "AB_Custom_2", "AB_Custom_3"]
+CPU_AGENTS = ["Random", "MM_Open", "MM_Center", "MM_Improved", "AB_Open",
+              "AB_Center", "AB_Improved"]
+
+AGENT_HELP = """
+Agents are named either "Random", or <prefix>_<heuristic> (e.g., AB_Improved,
+MM_Center, Greedy_Open) with prefixes: {}
+and heuristics: {}
+or <Class>[:<score_fn>[:<key>=<value>,...]] naming any player class and score
+function from game_agent.py or sample_players.py, e.g.
+AlphaBetaPlayer:improved_score:search_mode=pvs,tt_size=65536
+(option values are Python literals, class names such as MoveOrdering,
+which are constructed with default arguments, or else strings)
+(MCTS_<heuristic> agents guide their rollouts with the heuristic; use
+MCTSPlayer for random rollouts)
+""".format(", ".join(sorted(PLAYER_PREFIXES)), ", ".join(sorted(HEURISTICS)))
+
 DESCRIPTION = """
 This script evaluates the performance of the custom_score evaluation
 function against a baseline agent using alpha-beta search and iterative
@@ -36,38 +83,347 @@ game_agent.py.
 
 Agent = namedtuple("Agent", ["player", "name"])
 
+Z_95 = 1.959964  # two-sided 95% quantile of the standard normal distribution
+
+
+def elo_difference(score):
+    """Elo difference implied by an expected score (fraction of games won)."""
+    if score <= 0:
+        return float("-inf")
+    if score >= 1:
+        return float("inf")
+    return 400 * math.log10(score / (1 - score))
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+
+def elo_estimate(wins, games):
+    """Estimate the Elo difference of an agent from its wins, with a 95%
+    confidence interval from the Wilson score interval of the win rate
+    (whose bound on the far side of the estimate stays finite when an agent
+    wins or loses every game).
+
+    Returns
+    -------
+    (float, float, float)
+        The estimate and the lower and upper bounds of the interval (all
+        NaN if no games were played).
+    """
+    if not games:
+        return float("nan"), float("nan"), float("nan")
+    score = wins / games
+    z2 = Z_95 ** 2 / games
+    center = (score + z2 / 2) / (1 + z2)
+    margin = Z_95 * math.sqrt(score * (1 - score) / games + z2 / (4 * games)) / (1 + z2)
+    # pin the bounds that are exactly 0 or 1 against rounding error
+    lower = center - margin if wins > 0 else 0.
+    upper = center + margin if wins < games else 1.
+    return elo_difference(score), elo_difference(lower), elo_difference(upper)
+
+
+class SPRT:
+    """Sequential probability ratio test between the hypotheses that the
+    test agent is `elo0` (H0) or `elo1` (H1) Elo stronger than its opponent.
+
+    Isolation has no draws, so each game is a Bernoulli trial with win
+    probability 1 / (1 + 10 ** (-elo / 400)) under each hypothesis. A pairing
+    is decided once the log-likelihood ratio leaves the bounds set by the
+    false positive rate `alpha` and false negative rate `beta`.
+    """
+
+    def __init__(self, elo0=-50., elo1=50., alpha=0.05, beta=0.05):
+        self.elo0, self.elo1 = elo0, elo1
+        self.alpha, self.beta = alpha, beta
+        p0 = 1 / (1 + 10 ** (-elo0 / 400))
+        p1 = 1 / (1 + 10 ** (-elo1 / 400))
+        self._win_llr = math.log(p1 / p0)
+        self._loss_llr = math.log((1 - p1) / (1 - p0))
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def llr(self, wins, losses):
+        """Log-likelihood ratio of H1 against H0 after the given results."""
+        return wins * self._win_llr + losses * self._loss_llr
+
+    def decision(self, wins, losses):
+        """Return "H1" or "H0" once the test has accepted a hypothesis, or
+        None while more games are needed.
+        """
+        llr = self.llr(wins, losses)
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+
+def _lookup(name):
+    """Find a class or function by name in game_agent or sample_players."""
+    for module in (game_agent, sample_players):
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise ValueError("No player class or score function named {!r}".format(name))
+
+
+def make_agent(spec):
+    """Construct an Agent from its command-line name (see AGENT_HELP)."""
+    if spec == "Random":
+        return Agent(RandomPlayer(), spec)
+
+    prefix, _, heuristic = spec.partition("_")
+    if prefix in PLAYER_PREFIXES and heuristic in HEURISTICS:
+        return Agent(PLAYER_PREFIXES[prefix](score_fn=HEURISTICS[heuristic]), spec)
+
+    class_name, _, rest = spec.partition(":")
+    score_name, _, options = rest.partition(":")
+    kwargs = {}
+    if score_name:
+        kwargs["score_fn"] = HEURISTICS.get(score_name) or _lookup(score_name)
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        try:
+            kwargs[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            if value.isidentifier() and value[0].isupper():
+                # a class name: pass a new instance with default arguments
+                try:
+                    kwargs[key] = _lookup(value)()
+                except ValueError:
+                    raise ValueError(("Option {}={} of {!r} names no class in " +
+                                      "game_agent.py or sample_players.py").format(
+                                          key, value, spec)) from None
+            else:
+                kwargs[key] = value
+    return Agent(_lookup(class_name)(**kwargs), spec)
+
+
+def physical_cores():
+    """Return the number of physical CPU cores available to this process.
+
+    Hyper-threaded siblings are not counted: games are played against a
+    wall-clock TIME_LIMIT, so two searches sharing one core would each see
+    roughly half the search time they get when played sequentially.
+    """
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = os.cpu_count() or 1
+    try:
+        import psutil
+        return max(1, min(available, psutil.cpu_count(logical=False) or available))
+    except ImportError:
+        pass
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            cores = set()
+            physical_id = None
+            for line in cpuinfo:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key == "physical id":
+                    physical_id = value.strip()
+                elif key == "core id":
+                    cores.add((physical_id, value.strip()))
+        if cores:
+            return max(1, min(available, len(cores)))
+    except OSError:
+        pass
+    return max(1, available)
+
+
+def cap_workers(workers):
+    """Return the number of worker processes to use for `workers`, capped
+    at the number of physical cores with a warning."""
+    cores = physical_cores()
+    if workers > cores:
+        warnings.warn(("Using {} workers instead of {}: searches are timed by " +
+                       "the wall clock, so there must be no more workers than " +
+                       "physical cores.").format(cores, workers))
+        return cores
+    return workers
+
+
+def play_game(job):
+    """Play one game to completion and report the winning seat.
+
+    This is the unit of work sent to tournament worker processes, so it
+    reports the seat (0 for the first player, 1 for the second) rather than
+    the winning player object, which is a copy in a worker process. Each
+    game reseeds `random` with its own seed, so a seeded tournament replays
+    the same games however they are spread over workers, and the caller's
+    random state is restored afterwards, so games played in this process do
+    not change the openings drawn for later games.
+    """
+    game, time_limit, seed = job
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        players = (game.active_player, game.inactive_player)
+        winner, history, termination = game.play(time_limit=time_limit)
+    finally:
+        random.setstate(state)
+    return int(winner is players[1]), termination, history
+
+
+class Journal:
+    """Append-only record of finished tournament games, one JSON object per
+    line, that lets an interrupted tournament resume where it stopped.
+
+    Every entry is tagged with a fingerprint of the tournament configuration
+    (agents, time limit, board size, seed and sequential test, but not the
+    number of matches, so a finished run can also be extended). Entries with
+    a different fingerprint are ignored.
+
+    Parameters
+    ----------
+    path : str
+        The journal file; created if it does not exist.
+
+    config : dict
+        The settings that identify the tournament.
+    """
+
+    def __init__(self, path, config):
+        self.path = path
+        self.fingerprint = hashlib.sha1(
+            json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+        self._games = {}
+        if os.path.exists(path):
+            line = "\n"
+            with open(path) as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interruption
+                    if entry.pop("config", None) == self.fingerprint:
+                        self._games[Journal.key(entry)] = entry
+            if not line.endswith("\n"):
+                # end the cut-short line so the next entry starts a new one
+                with open(path, "a") as journal_file:
+                    journal_file.write("\n")
+
+    def __len__(self):
+        return len(self._games)
+
+    @staticmethod
+    def key(entry):
+        """Identify a game by its pairing, match number and test agent seat."""
+        return (entry["cpu_agent"], entry["test_agent"], entry["match"], entry["test_seat"])
+
+    def get(self, key):
+        """Return the journal entry for a finished game, or None."""
+        return self._games.get(key)
+
+    def append(self, entry):
+        """Record a finished game, flushing it to disk immediately."""
+        self._games[Journal.key(entry)] = entry
+        with open(self.path, "a") as journal_file:
+            journal_file.write(json.dumps(dict(entry, config=self.fingerprint)) + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+
+def play_round(cpu_agent, test_agents, win_counts, num_matches, executor=None,
+               time_limit=TIME_LIMIT, width=7, height=7, records=None,
+               game_counts=None, sprt=None, journal=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    The games are independent, so if a process pool `executor` is given they
+    are played in parallel; results are tallied in the order the games were
+    created either way. If `records` is a list, one dict per game (agent
+    names, match number, the test agent's seat, opening moves, winner,
+    termination and move history) is appended to it, and `game_counts` (if
+    given) is incremented per game played by each test agent.
+
+    With an `SPRT`, matches are played one at a time and a test agent stops
+    playing the cpu agent as soon as the test decides their pairing, so
+    `num_matches` is only an upper bound.
+
+    With a `Journal`, each finished game is appended to it, and games it
+    already holds are tallied from it instead of being played again. The
+    openings are drawn for every game either way, so a seeded tournament
+    resumes with the same openings it would have played.
     """
     timeout_count = 0
     forfeit_count = 0
-    for _ in range(num_matches):
-
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
-                    for agent in test_agents], [])
+    names = {agent.player: agent.name for agent in test_agents}
+    names[cpu_agent.player] = cpu_agent.name
+    played = {agent.player: 0 for agent in test_agents}
+    active = list(test_agents)
+    match = 0
+    remaining = num_matches
+    while remaining and active:
+        batch = remaining if sprt is None else 1
+        remaining -= batch
+
+        jobs = []
+        for _ in range(batch):
+
+            games = sum([[Board(cpu_agent.player, agent.player, width, height),
+                          Board(agent.player, cpu_agent.player, width, height)]
+                        for agent in active], [])
+
+            # initialize all games with a random move and response
+            opening = []
+            for _ in range(2):
+                move = random.choice(games[0].get_legal_moves())
+                opening.append(list(move))
+                for game in games:
+                    game.apply_move(move)
 
-        # initialize all games with a random move and response
-        for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
             for game in games:
-                game.apply_move(move)
-
-        # play all games and tally the results
-        for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
+                # the players in seat order, taken before the game is played
+                # (games played in this process are advanced in place)
+                players = (game.active_player, game.inactive_player)
+                test_seat = int(players[0] is cpu_agent.player)
+                entry = {"cpu_agent": cpu_agent.name,
+                         "test_agent": names[players[test_seat]],
+                         "match": match, "test_seat": test_seat,
+                         "opening": opening}
+                jobs.append((players, entry, (game, time_limit, random.getrandbits(32))))
+            match += 1
+
+        # play all games not already in the journal and tally the results
+        if journal is not None:
+            jobs = [(players, journal.get(Journal.key(entry)) or entry, job)
+                    for players, entry, job in jobs]
+        pending = [job for _, entry, job in jobs if "winner" not in entry]
+        results = map(play_game, pending) if executor is None else executor.map(play_game, pending)
+        for players, entry, _ in jobs:
+            if "winner" in entry:
+                winner_seat = entry["test_seat"] ^ (not entry["test_won"])
+                termination = entry["termination"]
+            else:
+                winner_seat, termination, history = next(results)
+                entry.update(winner=names[players[winner_seat]],
+                             test_won=winner_seat == entry["test_seat"],
+                             termination=termination, history=history)
+                if journal is not None:
+                    journal.append(entry)
+
+            winner = players[winner_seat]
             win_counts[winner] += 1
+            played[players[entry["test_seat"]]] += 1
+
+            if records is not None:
+                records.append(entry)
 
             if termination == "timeout":
                 timeout_count += 1
             elif termination == "forfeit":
                 forfeit_count += 1
 
+        if sprt is not None:
+            active = [agent for agent in active if sprt.decision(
+                win_counts[agent.player], played[agent.player] - win_counts[agent.player]) is None]
+
+    if game_counts is not None:
+        for player, count in played.items():
+            game_counts[player] += count
+
     return timeout_count, forfeit_count
 
 
@@ -77,12 +433,29 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, workers=1,
+                 time_limit=TIME_LIMIT, width=7, height=7, sprt=None,
+                 journal=None):
+    """Play matches between the test agent and each cpu_agent individually.
+
+    With more than one worker, the games of each round are played in a pool
+    of that many processes (capped at the number of physical cores). With an
+    `SPRT`, each pairing stops as soon as its result is decided. With a
+    `Journal`, finished games are recorded as they complete and games from
+    an earlier run of the same tournament are not played again.
+
+    Returns the list of per-game records (see play_round).
+    """
+    workers = cap_workers(workers)
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    records = []
+
     total_wins = {agent.player: 0 for agent in test_agents}
+    total_games = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
-    total_matches = 2 * num_matches * len(cpu_agents)
 
     print("\n{:^9}{:^13}".format("Match #", "Opponent") + ''.join(['{:^13}'.format(x[1].name) for x in enumerate(test_agents)]))
     print("{:^9}{:^13} ".format("", "") +  ' '.join(['{:^5}| {:^5}'.format("Won", "Lost") for x in enumerate(test_agents)]))
@@ -90,15 +463,18 @@ def play_matches(cpu_agents, test_agents, num_matches):
     for idx, agent in enumerate(cpu_agents):
         wins = {key: 0 for (key, value) in test_agents}
         wins[agent.player] = 0
+        games = {key: 0 for (key, value) in test_agents}
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches, executor,
+                            time_limit, width, height, records, games, sprt,
+                            journal)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
-        _total = 2 * num_matches
-        round_totals = sum([[wins[agent.player], _total - wins[agent.player]]
+        total_games = update(total_games, games)
+        round_totals = sum([[wins[agent.player], games[agent.player] - wins[agent.player]]
                             for agent in test_agents], [])
         print(' ' + ' '.join([
             '{:^5}| {:^5}'.format(
@@ -106,13 +482,22 @@ def play_matches(cpu_agents, test_agents, num_matches):
             ) for i in range(0, len(round_totals), 2)
         ]))
 
+    if executor is not None:
+        executor.shutdown()
+
     print("-" * 74)
     print('{:^9}{:^13}'.format("", "Win Rate:") +
         ''.join([
             '{:^13}'.format(
-                "{:.1f}%".format(100 * total_wins[x[1].player] / total_matches)
+                "{:.1f}%".format(100 * total_wins[x[1].player] / total_games[x[1].player])
             ) for x in enumerate(test_agents)
     ]))
+    print('{:^9}{:^13}'.format("", "Elo:") + ''.join([
+        '{:^13}'.format("{:+.0f}".format(elo_estimate(total_wins[x.player], total_games[x.player])[0]))
+        for x in test_agents]))
+    print('{:^9}{:^13}'.format("", "95% CI:") + ''.join([
+        '{:^13}'.format("{:+.0f}..{:+.0f}".format(*elo_estimate(total_wins[x.player], total_games[x.player])[1:]))
+        for x in test_agents]))
 
     if total_timeouts:
         print(("\nThere were {} timeouts during the tournament -- make sure " +
@@ -123,34 +508,117 @@ def play_matches(cpu_agents, test_agents, num_matches):
         print(("\nYour ID search forfeited {} games while there were still " +
                "legal moves available to play.\n").format(total_forfeits))
 
+    return records
+
+
+def summarize(records, sprt=None):
+    """Tally per-game records into one row per (cpu agent, test agent)
+    pairing with wins, losses, timeouts, forfeits and the Elo estimate (with
+    its 95% confidence interval) from the test agent's point of view, plus
+    the decision of the `sprt` if one is given.
+    """
+    rows = {}
+    for record in records:
+        key = (record["cpu_agent"], record["test_agent"])
+        row = rows.setdefault(key, {"cpu_agent": key[0], "test_agent": key[1],
+                                    "games": 0, "wins": 0, "losses": 0,
+                                    "timeouts": 0, "forfeits": 0})
+        won = record["test_won"]
+        row["games"] += 1
+        row["wins" if won else "losses"] += 1
+        if not won and record["termination"] == "timeout":
+            row["timeouts"] += 1
+        elif not won and record["termination"] == "forfeit":
+            row["forfeits"] += 1
+    for row in rows.values():
+        row["elo"], row["elo_low"], row["elo_high"] = elo_estimate(row["wins"], row["games"])
+        if sprt is not None:
+            row["sprt"] = sprt.decision(row["wins"], row["losses"])
+    return list(rows.values())
+
+
+def write_results(records, config, json_path=None, csv_path=None, sprt=None):
+    """Write the tournament results for scripts: the configuration, pairing
+    summary and every game record as JSON, and the pairing summary as CSV.
+    """
+    summary = summarize(records, sprt)
+    if json_path:
+        with open(json_path, "w") as json_file:
+            json.dump({"config": config, "summary": summary, "games": records},
+                      json_file, indent=2)
+    if csv_path:
+        with open(csv_path, "w", newline="") as csv_file:
+            fieldnames = ["cpu_agent", "test_agent", "games", "wins", "losses",
+                          "timeouts", "forfeits", "elo", "elo_low", "elo_high"]
+            writer = csv.DictWriter(csv_file, fieldnames=fieldnames + (["sprt"] if sprt else []))
+            writer.writeheader()
+            writer.writerows(summary)
+
 
 def main():
 
+    parser = argparse.ArgumentParser(
+        description=DESCRIPTION, epilog=AGENT_HELP,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-t", "--test-agents", nargs="+", default=TEST_AGENTS,
+                        metavar="AGENT", help="agents to evaluate")
+    parser.add_argument("-c", "--cpu-agents", nargs="+", default=CPU_AGENTS,
+                        metavar="AGENT", help="agents to evaluate against")
+    parser.add_argument("-n", "--matches", type=int, default=NUM_MATCHES,
+                        help="matches against each opponent; each match is " +
+                             "two games (default {})".format(NUM_MATCHES))
+    parser.add_argument("--time-limit", type=int, default=TIME_LIMIT,
+                        help="milliseconds per move (default {})".format(TIME_LIMIT))
+    parser.add_argument("--width", type=int, default=7, help="board width (default 7)")
+    parser.add_argument("--height", type=int, default=7, help="board height (default 7)")
+    parser.add_argument("--seed", type=int, help="seed for openings and move order")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="number of games to play in parallel (at most " +
+                             "the number of physical cores; default 1)")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"),
+                        help="stop each pairing once a sequential probability " +
+                             "ratio test decides whether the test agent is " +
+                             "ELO0 or ELO1 Elo stronger (e.g., -50 50); -n is " +
+                             "then the maximum number of matches")
+    parser.add_argument("--sprt-error", type=float, default=0.05, metavar="P",
+                        help="false positive and false negative rate of the " +
+                             "sequential test (default 0.05)")
+    parser.add_argument("--journal", metavar="PATH",
+                        help="append every finished game to this file, and " +
+                             "skip games it already holds for the same " +
+                             "configuration (to resume an interrupted run)")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--csv", metavar="PATH", help="write the pairing summary as CSV")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
-    test_agents = [
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score), "AB_Custom"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_2), "AB_Custom_2"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_3), "AB_Custom_3")
-    ]
+    test_agents = [make_agent(name) for name in args.test_agents]
 
     # Define a collection of agents to compete against the test agents
-    cpu_agents = [
-        Agent(RandomPlayer(), "Random"),
-        Agent(MinimaxPlayer(score_fn=open_move_score), "MM_Open"),
-        Agent(MinimaxPlayer(score_fn=center_score), "MM_Center"),
-        Agent(MinimaxPlayer(score_fn=improved_score), "MM_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=open_move_score), "AB_Open"),
-        Agent(AlphaBetaPlayer(score_fn=center_score), "AB_Center"),
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved")
-    ]
+    cpu_agents = [make_agent(name) for name in args.cpu_agents]
 
     print(DESCRIPTION)
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    sprt = None
+    if args.sprt:
+        sprt = SPRT(args.sprt[0], args.sprt[1], args.sprt_error, args.sprt_error)
+    journal = None
+    if args.journal:
+        journal = Journal(args.journal, {
+            key: getattr(args, key) for key in ("test_agents", "cpu_agents", "time_limit", "width",
+                                                "height", "seed", "sprt", "sprt_error")})
+        if len(journal):
+            print("Resuming from {} finished games in {}".format(len(journal), args.journal))
+    records = play_matches(cpu_agents, test_agents, args.matches, args.workers,
+                           args.time_limit, args.width, args.height, sprt,
+                           journal)
+    write_results(records, vars(args), args.json, args.csv, sprt)
 
 
 if __name__ == "__main__":